@@ -1,6 +1,7 @@
+import asyncio
 import logging
 import os
-from typing import Any, Sequence
+from typing import Any, Awaitable, Callable, Sequence
 
 import discord
 from aiohttp import ClientSession
@@ -8,10 +9,19 @@ from asyncpg import Pool
 from discord.ext import commands
 
 import config
+from classes.catalog import GameCatalog
 from classes.command_tree import OverBotCommandTree
+from classes.metrics import HostMetrics
+from classes.news import NewsDelivery, NewsFeed
+from classes.newsboard import NewsboardRegistry
 from classes.paginator import Paginator
+from classes.resolver import DisplayResolver
+from classes.snapshot import Snapshot
+from classes.startup import StartupGraph
+from classes.stats import BotCounters
 from classes.ui import PromptView
 from utils import emojis
+from utils.cache import registry
 from utils.time import human_timedelta
 
 log = logging.getLogger(__name__)
@@ -26,23 +36,48 @@ class OverBot(commands.AutoShardedBot):
     pool: Pool
     app_info: discord.AppInfo
 
-    def __init__(self, **kwargs: Any) -> None:
+    tree: OverBotCommandTree
+
+    def __init__(self, *, force_sync: bool = False, **kwargs: Any) -> None:
         super().__init__(
             command_prefix=config.default_prefix, tree_cls=OverBotCommandTree, **kwargs
         )
         self.config = config
+        self.force_sync: bool = force_sync
         self.sloc: int = 0
 
         # caching
         self.premiums: set[int] = set()
         self.embed_colors: dict[int, int] = {}
-        self.heroes: dict[str, dict[Any, Any]] = {}
-        self.maps: dict[str, dict[Any, Any]] = {}
-        self.gamemodes: dict[str, dict[Any, Any]] = {}
-
         self.BASE_URL: str = config.base_url
+        self.catalog: GameCatalog = GameCatalog(base_url=self.BASE_URL)
+        # cache name -> task reloading it after a flush
+        self._reloads: dict[str, asyncio.Task[None]] = {}
+        self._register_caches()
+
+        self.newsboards: NewsboardRegistry = NewsboardRegistry(self)
+        self.news_delivery: NewsDelivery = NewsDelivery(self)
+        self.news_feed: NewsFeed = NewsFeed(self)
+        self.counters: BotCounters = BotCounters()
+        self.displays: DisplayResolver = DisplayResolver(self)
+        self.host_metrics: HostMetrics = HostMetrics()
+        # documents shared with the website, refreshed by the Tasks cog
+        self.snapshots: dict[str, Snapshot] = {}
+
         self.TEST_GUILD: discord.Object = discord.Object(config.test_guild_id)
 
+    @property
+    def heroes(self) -> dict[str, dict[Any, Any]]:
+        return self.catalog.heroes
+
+    @property
+    def maps(self) -> dict[str, dict[Any, Any]]:
+        return self.catalog.maps
+
+    @property
+    def gamemodes(self) -> dict[str, dict[Any, Any]]:
+        return self.catalog.gamemodes
+
     @property
     def owner(self) -> discord.User:
         return self.app_info.team.owner  # type: ignore # team is not None
@@ -112,6 +147,35 @@ class OverBot(commands.AutoShardedBot):
                 """
         await self.pool.execute(query, member_id)
 
+    async def reconcile_guilds(self) -> tuple[int, int]:
+        """Makes the server table match the guilds the bot is in.
+
+        Returns how many servers have been removed and inserted.
+        """
+        guild_ids = [(guild.id,) for guild in self.guilds]
+        if not guild_ids:
+            # most likely not connected yet, do not wipe the whole table
+            return 0, 0
+
+        async with self.pool.acquire() as conn, conn.transaction():
+            query = "CREATE TEMPORARY TABLE current_guild (id BIGINT PRIMARY KEY) ON COMMIT DROP;"
+            await conn.execute(query)
+            await conn.copy_records_to_table("current_guild", records=guild_ids)
+            query = """DELETE FROM server
+                       WHERE NOT EXISTS (SELECT 1 FROM current_guild WHERE current_guild.id = server.id)
+                       RETURNING id;
+                    """
+            removed = [r["id"] for r in await conn.fetch(query)]
+            query = """INSERT INTO server (id)
+                       SELECT id FROM current_guild
+                       ON CONFLICT (id) DO NOTHING;
+                    """
+            status = await conn.execute(query)
+
+        # deleting a server cascades to its newsboard
+        self.newsboards.forget_guilds(removed)
+        return len(removed), int(status.split()[-1])
+
     def tick(self, opt: None | bool) -> discord.PartialEmoji:
         lookup = {
             True: emojis.online,
@@ -120,24 +184,54 @@ class OverBot(commands.AutoShardedBot):
         }
         return lookup.get(opt, emojis.dnd)
 
-    def compute_sloc(self) -> None:
-        """Compute source lines of code."""
-
-        def read_file_lines(root, file):
-            if file.endswith(".py"):
-                with open(f"{root}/{file}", "r") as fp:
-                    nc = [_.strip() for _ in fp if not _.startswith("#")]  # remove comment lines
-                    self.sloc += len([_ for _ in nc if _])  # remove blank lines
+    def compute_sloc(self) -> int:
+        """Compute source lines of code.
 
+        This walks the whole working directory, so run it in a thread.
+        """
+        sloc = 0
         for root, dirs, files in os.walk(os.getcwd()):
             dirs[:] = set(dirs) - {"env"}
             for file in files:
-                read_file_lines(root, file)
+                if file.endswith(".py"):
+                    with open(f"{root}/{file}", "r") as fp:
+                        # remove comment lines
+                        nc = [_.strip() for _ in fp if not _.startswith("#")]
+                        sloc += len([_ for _ in nc if _])  # remove blank lines
+        return sloc
 
     def is_it_premium(self, *to_check) -> bool:
         """Check for a member/guild to be premium."""
         return any(x in self.premiums for x in to_check)
 
+    def _register_caches(self) -> None:
+        # premiums and embed colors mirror the database, they are never
+        # emptied but reloaded from it, so that nobody loses their perks
+        registry.register(
+            "premiums",
+            lambda: self.premiums,
+            flush=lambda: self._reload("premiums", self._cache_premiums),
+            warm=self._cache_premiums,
+        )
+        registry.register(
+            "embed_colors",
+            lambda: self.embed_colors,
+            flush=lambda: self._reload("embed_colors", self._cache_embed_colors),
+            warm=self._cache_embed_colors,
+        )
+        # emptying the catalog would leave its lookups inconsistent,
+        # it is replaced with a freshly fetched one instead
+        for name in ("heroes", "maps", "gamemodes"):
+            registry.register(
+                name,
+                lambda name=name: getattr(self.catalog, name),
+                flush=lambda: self._reload("catalog", self._refresh_catalog),
+                warm=self._refresh_catalog,
+            )
+        registry.register(
+            "hero_details", lambda: self.catalog.hero_details, warm=self._prewarm_heroes
+        )
+
     async def _cache_premiums(self) -> None:
         query = """SELECT id
                    FROM member
@@ -158,80 +252,106 @@ class OverBot(commands.AutoShardedBot):
             embed_colors[member_id] = color
         self.embed_colors = embed_colors
 
-    async def _cache_heroes(self) -> None:
+    async def _refresh_catalog(self) -> None:
+        # so that the API can't answer with 304 Not Modified
+        await self.catalog.refresh(session=self.session, force=True)
+
+    def _reload(self, name: str, reload: Callable[[], Awaitable[None]]) -> None:
+        task = self._reloads.get(name)
+        if task is not None and not task.done():
+            return
+
+        async def run() -> None:
+            try:
+                await reload()
+            except Exception:
+                log.exception(f"Cannot reload cache {name}.")
+
+        self._reloads[name] = asyncio.create_task(run())
+
+    async def _prewarm_heroes(self) -> None:
+        await self.catalog.prewarm_heroes(session=self.session)
+
+    async def _load_catalog(self) -> None:
         try:
-            data = await self.session.get(f"{self.BASE_URL}/heroes")
-        except Exception:
-            log.exception("Cannot get heroes. Aborting...")
-            await self.close()
-        else:
-            data = await data.json()
-            heroes = {}
-            for hero in data:
-                heroes[hero.pop("key")] = hero
-            self.heroes = heroes
-            log.info("Heroes successfully cached.")
-
-    async def _cache_maps(self) -> None:
+            if await self.catalog.load():
+                log.info("Catalog successfully loaded from snapshot.")
+                # the snapshot is refreshed in the background by the Tasks cog
+                return
+
+            # no snapshot yet, the first fetch has to happen now
+            if not await self.catalog.refresh(session=self.session):
+                log.warning("Catalog unavailable, it will be fetched in the background.")
+        finally:
+            # let the Tasks cog start refreshing it
+            self.catalog.mark_loaded()
+
+    async def load_extension(self, name: str, *, package: None | str = None) -> None:
+        await super().load_extension(name, package=package)
+        self.tree.rebuild_index()
+
+    async def unload_extension(self, name: str, *, package: None | str = None) -> None:
+        await super().unload_extension(name, package=package)
+        self.tree.rebuild_index()
+
+    async def reload_extension(self, name: str, *, package: None | str = None) -> None:
+        await super().reload_extension(name, package=package)
+        self.tree.rebuild_index()
+
+    async def _fetch_app_info(self) -> None:
+        self.app_info = await self.application_info()
+
+    async def _compute_sloc(self) -> None:
+        self.sloc = await asyncio.to_thread(self.compute_sloc)
+
+    async def _load_extension(self, extension: str) -> None:
         try:
-            data = await self.session.get(f"{self.BASE_URL}/maps")
+            await self.load_extension(f"cogs.{extension[:-3]}")
         except Exception:
-            log.exception("Cannot get maps. Aborting...")
-            await self.close()
+            log.exception(f"Extension {extension} failed its loading.")
         else:
-            data = await data.json()
-            maps = {}
-            for map_ in data:
-                maps[map_.get("name")] = map_
-            self.maps = maps
-            log.info("Maps successfully cached.")
-
-    async def _cache_gamemodes(self) -> None:
-        try:
-            data = await self.session.get(f"{self.BASE_URL}/gamemodes")
-        except Exception:
-            log.exception("Cannot get gamemodes. Aborting...")
-            await self.close()
+            log.info(f"Extension {extension} successfully loaded.")
+
+    async def _load_extensions(self) -> None:
+        extensions = [e for e in os.listdir("cogs") if e.endswith(".py")]
+        await asyncio.gather(*(self._load_extension(e) for e in extensions))
+
+    async def _sync_tree(self) -> None:
+        force = self.force_sync
+        if self.debug:
+            self.tree.copy_global_to(guild=self.TEST_GUILD)
+            await self.tree.sync_if_changed(guild=self.TEST_GUILD, force=force)
         else:
-            data = await data.json()
-            gamemodes = {}
-            for gamemode in data:
-                gamemodes[gamemode.pop("key")] = gamemode
-            self.gamemodes = gamemodes
-            log.info("Gamemodes successfully cached.")
+            await self.tree.sync_if_changed(force=force)
+            await self.tree.sync_if_changed(guild=self.TEST_GUILD, force=force)
 
     async def setup_hook(self) -> None:
         self.session = ClientSession()
-        self.app_info = await self.application_info()
-        self.compute_sloc()
+        self.host_metrics.start()
+
+        startup = StartupGraph()
+        startup.add("app_info", self._fetch_app_info)
+        startup.add("sloc", self._compute_sloc)
 
         # caching
-        await self._cache_premiums()
-        await self._cache_embed_colors()
-        await self._cache_heroes()
-        await self._cache_maps()
-        await self._cache_gamemodes()
-
-        for extension in os.listdir("cogs"):
-            if extension.endswith(".py"):
-                try:
-                    await self.load_extension(f"cogs.{extension[:-3]}")
-                except Exception:
-                    log.exception(f"Extension {extension} failed its loading.")
-                else:
-                    log.info(f"Extension {extension} successfully loaded.")
+        startup.add("premiums", self._cache_premiums)
+        startup.add("embed_colors", self._cache_embed_colors)
+        startup.add("catalog", self._load_catalog)
+        startup.add("news", self.news_feed.load)
+        startup.add("newsboards", self.newsboards.load)
+        startup.add("displays", lambda: asyncio.to_thread(self.displays.load))
 
-        if self.debug:
-            self.tree.copy_global_to(guild=self.TEST_GUILD)
-            await self.tree.sync(guild=self.TEST_GUILD)
-        else:
-            await self.tree.sync()
-            await self.tree.sync(guild=self.TEST_GUILD)
+        startup.add("extensions", self._load_extensions)
+        startup.add("tree_sync", self._sync_tree, requires=("extensions",))
+
+        await startup.run()
+        log.info(f"OverBot {self.version} startup completed.\n{startup.report()}")
 
     async def start(self) -> None:
         await super().start(config.token, reconnect=True)
 
     async def close(self) -> None:
+        self.host_metrics.stop()
         await super().close()
         await self.session.close()
         await self.pool.close()
@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+import json
+import logging
+import os
+import time
+import uuid
+from pathlib import Path
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Mapping
+
+import aiohttp
+
+from utils.search import SearchIndex
+
+if TYPE_CHECKING:
+    Catalog = dict[str, dict[str, Any]]
+
+log = logging.getLogger(__name__)
+
+# Bump whenever the layout of the snapshot changes, older snapshots get ignored.
+CATALOG_VERSION = 1
+
+ENDPOINTS = ("heroes", "maps", "gamemodes")
+
+# Nicknames that can't be reached by typing part of the hero name.
+HERO_ALIASES = {
+    "soldier-76": ("s76",),
+    "wrecking-ball": ("hammond",),
+    "junker-queen": ("jq",),
+}
+
+# How long (in seconds) hero details are served before being fetched again.
+HERO_DETAILS_TTL = 6 * 60 * 60.0
+
+
+class GameCatalog:
+    """Heroes, maps and gamemodes provided by OverFast API.
+
+    The catalog is persisted to a local snapshot so that it is available
+    right away on boot, even when the API is unreachable, and refreshed
+    in the background using conditional requests.
+    """
+
+    def __init__(self, *, base_url: str, filename: str = "data/catalog.json") -> None:
+        self.base_url: str = base_url
+        self.filename: str = filename
+        self.heroes: Catalog = {}
+        self.maps: Catalog = {}
+        self.gamemodes: Catalog = {}
+        self.hero_index: SearchIndex = SearchIndex()
+        self.map_index: SearchIndex = SearchIndex()
+        self.gamemode_index: SearchIndex = SearchIndex()
+        # read-only lookups, rebuilt along with the catalog
+        self.all_heroes: tuple[dict[str, Any], ...] = ()
+        self.all_maps: tuple[dict[str, Any], ...] = ()
+        self.heroes_by_role: Mapping[str, tuple[dict[str, Any], ...]] = MappingProxyType({})
+        self.maps_by_gamemode: Mapping[str, tuple[dict[str, Any], ...]] = MappingProxyType({})
+        self.gamemodes_by_key: Mapping[str, dict[str, Any]] = MappingProxyType({})
+        self.updated_at: None | datetime.datetime = None
+        # ETag and Last-Modified headers of the last successful response for each endpoint
+        self.validators: dict[str, dict[str, str]] = {}
+        # hero key -> (details, monotonic time they have been fetched at)
+        self.hero_details: dict[str, tuple[dict[str, Any], float]] = {}
+        self._hero_requests: dict[str, asyncio.Task[None | dict[str, Any]]] = {}
+        self._lock = asyncio.Lock()
+        # set once the startup load is over, whether it succeeded or not
+        self._loaded = asyncio.Event()
+
+    def __bool__(self) -> bool:
+        return bool(self.heroes or self.maps or self.gamemodes)
+
+    @staticmethod
+    def _index(endpoint: str, data: list[dict[str, Any]]) -> Catalog:
+        if endpoint == "maps":
+            return {map_["name"]: map_ for map_ in data}
+        return {item.pop("key"): item for item in data}
+
+    def _swap(self, heroes: Catalog, maps: Catalog, gamemodes: Catalog) -> None:
+        hero_index = SearchIndex(
+            (key, hero["name"], HERO_ALIASES.get(key, ())) for key, hero in heroes.items()
+        )
+        map_index = SearchIndex((key, map_["name"], ()) for key, map_ in maps.items())
+        gamemode_index = SearchIndex((key, mode["name"], ()) for key, mode in gamemodes.items())
+
+        heroes_by_role: dict[str, list[dict[str, Any]]] = {}
+        for hero in heroes.values():
+            heroes_by_role.setdefault(hero["role"], []).append(hero)
+
+        maps_by_gamemode: dict[str, list[dict[str, Any]]] = {}
+        for map_ in maps.values():
+            for gamemode in map_["gamemodes"]:
+                maps_by_gamemode.setdefault(gamemode, []).append(map_)
+
+        # nothing is awaited here, so readers only ever see either the old or the new catalog
+        self.heroes, self.maps, self.gamemodes = heroes, maps, gamemodes
+        self.hero_index = hero_index
+        self.map_index = map_index
+        self.gamemode_index = gamemode_index
+        self.all_heroes = tuple(heroes.values())
+        self.all_maps = tuple(maps.values())
+        self.heroes_by_role = MappingProxyType({k: tuple(v) for k, v in heroes_by_role.items()})
+        self.maps_by_gamemode = MappingProxyType({k: tuple(v) for k, v in maps_by_gamemode.items()})
+        self.gamemodes_by_key = MappingProxyType(dict(gamemodes))
+
+    def dump(self) -> dict[str, Any]:
+        return {
+            "version": CATALOG_VERSION,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "validators": self.validators,
+            "heroes": self.heroes,
+            "maps": self.maps,
+            "gamemodes": self.gamemodes,
+        }
+
+    def read(self) -> None | dict[str, Any]:
+        """Reads the local snapshot. This does blocking I/O."""
+        try:
+            with open(self.filename, "r", encoding="utf-8") as fp:
+                data = json.load(fp)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            log.exception("Cannot read the catalog snapshot.")
+            return None
+
+        if data.get("version") != CATALOG_VERSION:
+            log.info("Ignoring outdated catalog snapshot.")
+            return None
+        return data
+
+    async def load(self) -> bool:
+        """Loads the local snapshot and returns whether there was one."""
+        data = await asyncio.to_thread(self.read)
+        if data is None:
+            return False
+
+        async with self._lock:
+            if updated_at := data.get("updated_at"):
+                self.updated_at = datetime.datetime.fromisoformat(updated_at)
+            self.validators = data.get("validators", {})
+            self._swap(data["heroes"], data["maps"], data["gamemodes"])
+        return True
+
+    def mark_loaded(self) -> None:
+        self._loaded.set()
+
+    async def wait_until_loaded(self) -> None:
+        await self._loaded.wait()
+
+    def save(self) -> None:
+        """Atomically writes the local snapshot. This does blocking I/O."""
+        Path(self.filename).parent.mkdir(parents=True, exist_ok=True)
+        temp = f"{self.filename}.{uuid.uuid4()}.tmp"
+        with open(temp, "w", encoding="utf-8") as tmp:
+            json.dump(self.dump(), tmp)
+
+        # atomically move the file
+        os.replace(temp, self.filename)
+
+    async def _fetch(
+        self, endpoint: str, *, session: aiohttp.ClientSession
+    ) -> None | tuple[Catalog, dict[str, str]]:
+        """Returns the new data for an endpoint, or None if it did not change."""
+        headers = {}
+        validators = self.validators.get(endpoint, {})
+        if etag := validators.get("etag"):
+            headers["If-None-Match"] = etag
+        if last_modified := validators.get("last_modified"):
+            headers["If-Modified-Since"] = last_modified
+
+        url = f"{self.base_url}/{endpoint}"
+        timeout = aiohttp.ClientTimeout(total=30.0)
+        async with session.get(url, headers=headers, timeout=timeout) as r:
+            if r.status == 304:
+                return None
+            r.raise_for_status()
+            data = await r.json()
+
+        validators = {}
+        if etag := r.headers.get("ETag"):
+            validators["etag"] = etag
+        if last_modified := r.headers.get("Last-Modified"):
+            validators["last_modified"] = last_modified
+        return self._index(endpoint, data), validators
+
+    async def refresh(self, *, session: aiohttp.ClientSession, force: bool = False) -> bool:
+        """Refreshes the catalog and returns whether something changed.
+
+        Endpoints that cannot be reached keep their current data. If force is
+        set, the validators are dropped so that everything is fetched again.
+        """
+        async with self._lock:
+            if force:
+                self.validators.clear()
+
+            results = await asyncio.gather(
+                *(self._fetch(e, session=session) for e in ENDPOINTS), return_exceptions=True
+            )
+
+            catalog = {e: getattr(self, e) for e in ENDPOINTS}
+            changed = []
+            for endpoint, result in zip(ENDPOINTS, results):
+                if isinstance(result, BaseException):
+                    log.warning(f"Cannot refresh {endpoint}: {result!r}")
+                elif result is not None:
+                    catalog[endpoint], self.validators[endpoint] = result
+                    changed.append(endpoint)
+
+            if not changed:
+                return False
+
+            self._swap(**catalog)
+            self.updated_at = datetime.datetime.now(datetime.UTC)
+            try:
+                await asyncio.to_thread(self.save)
+            except OSError:
+                log.exception("Cannot write the catalog snapshot.")
+
+            log.info(f"Catalog successfully refreshed ({', '.join(changed)}).")
+            return True
+
+    def _is_fresh(self, key: str) -> bool:
+        try:
+            _, fetched_at = self.hero_details[key]
+        except KeyError:
+            return False
+        return time.monotonic() - fetched_at < HERO_DETAILS_TTL
+
+    async def _fetch_hero(
+        self, key: str, *, session: aiohttp.ClientSession
+    ) -> None | dict[str, Any]:
+        url = f"{self.base_url}/heroes/{key}"
+        timeout = aiohttp.ClientTimeout(total=30.0)
+        async with session.get(url, timeout=timeout) as r:
+            if r.status in (404, 422):
+                return None
+            r.raise_for_status()
+            data = await r.json()
+        self.hero_details[key] = (data, time.monotonic())
+        return data
+
+    async def get_hero(self, key: str, *, session: aiohttp.ClientSession) -> None | dict[str, Any]:
+        """Returns the details of a hero, or None if the hero does not exist.
+
+        Stale details are served if the API cannot be reached.
+        """
+        if self.heroes and key not in self.heroes:
+            return None
+
+        if self._is_fresh(key):
+            return self.hero_details[key][0]
+
+        # share a single request between concurrent callers
+        task = self._hero_requests.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch_hero(key, session=session))
+            self._hero_requests[key] = task
+            task.add_done_callback(lambda _: self._hero_requests.pop(key, None))
+
+        try:
+            return await asyncio.shield(task)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if key in self.hero_details:
+                return self.hero_details[key][0]
+            raise
+
+    async def prewarm_heroes(self, *, session: aiohttp.ClientSession, concurrency: int = 4) -> int:
+        """Fetches the details of every hero that is missing or stale.
+
+        Returns the number of heroes fetched.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(key: str) -> bool:
+            async with semaphore:
+                try:
+                    await self.get_hero(key, session=session)
+                except Exception as e:
+                    log.warning(f"Cannot prewarm hero {key}: {e!r}")
+                    return False
+                return True
+
+        keys = [k for k in self.heroes if not self._is_fresh(k)]
+        results = await asyncio.gather(*(fetch(k) for k in keys))
+        return sum(results)
@@ -1,6 +1,12 @@
+import hashlib
+import itertools
+import json
 import logging
+import os
 import traceback
-from typing import TYPE_CHECKING
+import uuid
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
 import discord
 from asyncpg import DataError
@@ -22,8 +28,147 @@ if TYPE_CHECKING:
 
 log = logging.getLogger(__name__)
 
+AppCommand = app_commands.Command[Any, ..., Any] | app_commands.ContextMenu
+
+
+class CommandMetadata:
+    """Everything the help command, autocomplete and the private API need about a command."""
+
+    __slots__ = (
+        "qualified_name",
+        "description",
+        "parameters",
+        "cog",
+        "type",
+        "premium",
+        "guild_only",
+        "embed",
+    )
+
+    def __init__(self, command: AppCommand) -> None:
+        self.qualified_name: str = command.qualified_name
+        self.premium: bool = command.extras.get("premium", False)
+
+        if isinstance(command, app_commands.ContextMenu):
+            self.description: str = command.callback.__doc__ or "No description found..."
+            self.parameters: tuple[app_commands.Parameter, ...] = ()
+            self.cog: None | str = getattr(command, "__cog_name__", None)
+            self.type: str = "Context Menu"
+            self.guild_only: bool = False
+        else:
+            self.description = command.description or "No description found..."
+            self.parameters = tuple(command.parameters)
+            self.cog = command.binding.qualified_name if command.binding else None
+            self.type = "App Command"
+            self.guild_only = command.guild_only
+
+        self.embed: discord.Embed = self._build_embed()
+
+    def _build_embed(self) -> discord.Embed:
+        signature = " ".join(map(lambda p: f"`{p.name}`", self.parameters))
+
+        embed = discord.Embed()
+        embed.title = f"/{self.qualified_name} {signature}"
+        embed.description = self.description
+
+        parameters = []
+        for p in self.parameters:
+            tmp = f"`{p.name}`: {p.description}{' [**R**]' if p.required else ' [**O**]'}"
+            parameters.append(tmp)
+
+        if parameters:
+            embed.set_footer(text="[R] = Required / [O] = Optional")
+            embed.add_field(name="Parameters", value="\n".join(parameters))
+        return embed
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "cog": self.cog,
+            "name": self.qualified_name,
+            "type": self.type,
+            "is_premium": self.premium,
+            "description": self.description,
+            "guild_only": self.guild_only,
+        }
+
 
 class OverBotCommandTree(app_commands.CommandTree):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # slash commands, keyed by qualified name
+        self.metadata: dict[str, CommandMetadata] = {}
+        self.context_menus: dict[str, CommandMetadata] = {}
+        self._lowered_names: tuple[tuple[str, str], ...] = ()
+
+    def rebuild_index(self) -> None:
+        """Rebuilds the command metadata. Must be called whenever the tree changes."""
+        metadata = {}
+        for command in self.walk_commands():
+            if isinstance(command, app_commands.Group):
+                continue  # groups are not commands
+            metadata[command.qualified_name] = CommandMetadata(command)
+
+        context_menus = {}
+        for menu in self.get_commands(type=discord.AppCommandType.user):
+            context_menus[menu.qualified_name] = CommandMetadata(menu)
+
+        self.metadata = metadata
+        self.context_menus = context_menus
+        self._lowered_names = tuple((name.lower(), name) for name in sorted(metadata))
+
+    def search_commands(self, current: str, *, limit: int = 25) -> list[str]:
+        current = current.lower()
+        names = (name for lowered, name in self._lowered_names if current in lowered)
+        return list(itertools.islice(names, limit))
+
+    # hashes of the last synced command trees, keyed by application and scope
+    HASHES_FILE = "data/tree.json"
+
+    def compute_hash(self, *, guild: None | discord.abc.Snowflake = None) -> str:
+        """Computes a stable hash of the commands that would be synced."""
+        payload = [c.to_dict(self) for c in self.get_commands(guild=guild)]
+        payload.sort(key=lambda c: (c.get("type", 1), c["name"]))
+        raw = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _load_hashes(self) -> dict[str, str]:
+        try:
+            with open(self.HASHES_FILE, "r", encoding="utf-8") as fp:
+                return json.load(fp)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_hashes(self, hashes: dict[str, str]) -> None:
+        Path(self.HASHES_FILE).parent.mkdir(parents=True, exist_ok=True)
+        temp = f"{self.HASHES_FILE}.{uuid.uuid4()}.tmp"
+        with open(temp, "w", encoding="utf-8") as tmp:
+            json.dump(hashes, tmp)
+
+        # atomically move the file
+        os.replace(temp, self.HASHES_FILE)
+
+    async def sync_if_changed(
+        self, *, guild: None | discord.abc.Snowflake = None, force: bool = False
+    ) -> bool:
+        """Syncs the commands only if they changed since the last sync.
+
+        Returns whether a sync has been performed.
+        """
+        scope = "global" if guild is None else str(guild.id)
+        key = f"{self.client.application_id}:{scope}"
+        digest = self.compute_hash(guild=guild)
+        hashes = self._load_hashes()
+
+        if not force and hashes.get(key) == digest:
+            log.info(f"Application commands ({scope}) unchanged, skipping sync.")
+            return False
+
+        await self.sync(guild=guild)
+        hashes[key] = digest
+        self._save_hashes(hashes)
+        log.info(f"Application commands ({scope}) successfully synced.")
+        return True
+
     @staticmethod
     async def _send(interaction: discord.Interaction, *args, **kwargs) -> None:
         if interaction.response.is_done():
@@ -64,6 +64,8 @@ class UnknownError(RequestError):
 
 class TooManyAccounts(RequestError):
     def __init__(self, battletag: str, players: int) -> None:
+        self.battletag = battletag
+        self.players = players
         message = (
             f"**{players}** accounts found named `{battletag}`. Please "
             f"be more specific by entering the exact **BattleTag**."
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import collections
+import logging
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+
+class HostSample:
+    __slots__ = ("taken_at", "cpu_percent", "ram_percent", "cpu_frequency")
+
+    def __init__(
+        self, *, cpu_percent: float, ram_percent: float, cpu_frequency: None | float
+    ) -> None:
+        self.taken_at: float = time.monotonic()
+        self.cpu_percent: float = cpu_percent
+        self.ram_percent: float = ram_percent
+        self.cpu_frequency: None | float = cpu_frequency  # GHz
+
+
+class HostMetrics:
+    """Samples host metrics from a background thread.
+
+    psutil and distro do blocking syscalls and file reads, so they never
+    run on the event loop. Samples are kept in a ring buffer; readers only
+    look at the latest sample or copy the buffer, which needs no lock.
+    """
+
+    def __init__(self, *, interval: float = 5.0, size: int = 120) -> None:
+        self.interval: float = interval
+        self.samples: collections.deque[HostSample] = collections.deque(maxlen=size)
+        self.latest: None | HostSample = None
+        # these never change while running
+        self.os_name: str = "N/A"
+        self.cpu_cores: None | int = None
+        self._stop = threading.Event()
+        self._thread: None | threading.Thread = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="host-metrics", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        # only needed here, keep them out of the bot startup
+        import distro
+        import psutil
+
+        self.os_name = f"{distro.name()} {distro.version()}"
+        self.cpu_cores = psutil.cpu_count()
+        # the first call only sets the baseline of the following ones
+        psutil.cpu_percent()
+
+        while not self._stop.wait(self.interval):
+            # it seems psutil is unable to read cpu_freq when running docker on top of M1 chip.
+            try:
+                cpu_frequency = round(psutil.cpu_freq()[0] / 1000, 2)
+            except (TypeError, NotImplementedError):
+                cpu_frequency = None
+
+            try:
+                sample = HostSample(
+                    cpu_percent=psutil.cpu_percent(),
+                    ram_percent=psutil.virtual_memory()[2],
+                    cpu_frequency=cpu_frequency,
+                )
+            except Exception:
+                log.exception("Cannot sample host metrics.")
+                continue
+
+            self.samples.append(sample)
+            self.latest = sample
+
+    def average(self, window: float = 60.0) -> tuple[None | float, None | float]:
+        """Returns the average CPU and RAM usage over the last window seconds."""
+        since = time.monotonic() - window
+        # copying the deque is done in a single C call, no sample can be added meanwhile
+        samples = [s for s in tuple(self.samples) if s.taken_at >= since]
+        if not samples:
+            return None, None
+        cpu = sum(s.cpu_percent for s in samples) / len(samples)
+        ram = sum(s.ram_percent for s in samples) / len(samples)
+        return round(cpu, 1), round(ram, 1)
@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+import hashlib
+import logging
+import re
+import time
+from typing import TYPE_CHECKING, Any
+
+import aiohttp
+import discord
+
+from utils.scrape import parse_news
+
+if TYPE_CHECKING:
+    from bot import OverBot
+
+    News = dict[str, Any]
+
+log = logging.getLogger(__name__)
+
+# Discord allows 50 requests per second per bot, keep some room for everything else.
+GLOBAL_RATE = 40.0
+
+# How many deliveries are recorded at once.
+FLUSH_SIZE = 50
+
+# How long delivery records are kept around.
+DELIVERY_RETENTION = datetime.timedelta(days=30)
+
+
+NEWS_ID = re.compile(r"\d+")
+
+
+def news_embed(news: News) -> discord.Embed:
+    embed = discord.Embed()
+    embed.title = news["title"]
+    embed.url = news["link"]
+    embed.set_author(name="Blizzard Entertainment")
+    embed.set_image(url=news["thumbnail"])
+    embed.set_footer(text=news["date"])
+    return embed
+
+
+class RateLimiter:
+    """Spaces out calls so that no more than rate calls per second are made."""
+
+    def __init__(self, rate: float) -> None:
+        self.interval: float = 1.0 / rate
+        self._next: float = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            if self._next > now:
+                await asyncio.sleep(self._next - now)
+                now = self._next
+            self._next = now + self.interval
+
+
+class DeliveryReport:
+    __slots__ = ("news_id", "sent", "skipped", "pruned", "failed", "elapsed")
+
+    def __init__(self, news_id: int) -> None:
+        self.news_id: int = news_id
+        self.sent: int = 0
+        self.skipped: int = 0  # already delivered before a restart
+        self.pruned: int = 0
+        self.failed: int = 0
+        self.elapsed: float = 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"news {self.news_id}: sent to {self.sent} channels in {self.elapsed:.2f}s "
+            f"({self.skipped} already delivered, {self.pruned} pruned, {self.failed} failed)"
+        )
+
+
+class NewsDelivery:
+    """Delivers news to every newsboard.
+
+    Channels are sent to concurrently. Each message goes to a different
+    channel, thus to a different rate limit bucket which discord.py already
+    waits on, so only the global rate limit needs to be enforced here.
+    Delivered channels are recorded so that an interrupted broadcast is
+    resumed rather than sent twice.
+    """
+
+    def __init__(self, bot: OverBot, *, concurrency: int = 16, rate: float = GLOBAL_RATE) -> None:
+        self.bot: OverBot = bot
+        self.concurrency: int = concurrency
+        self.limiter: RateLimiter = RateLimiter(rate)
+        self._lock = asyncio.Lock()
+
+    async def _pending_channels(self, news_id: int) -> tuple[list[int], int]:
+        query = "SELECT channel_id FROM news_delivery WHERE news_id = $1;"
+        delivered = {r["channel_id"] for r in await self.bot.pool.fetch(query, news_id)}
+        channel_ids = [n.channel_id for n in self.bot.newsboards]
+        pending = [c for c in channel_ids if c not in delivered]
+        return pending, len(channel_ids) - len(pending)
+
+    async def _record(self, news_id: int, channel_ids: list[int]) -> None:
+        if not channel_ids:
+            return
+        query = """INSERT INTO news_delivery (news_id, channel_id)
+                   VALUES ($1, $2)
+                   ON CONFLICT (news_id, channel_id) DO NOTHING;
+                """
+        await self.bot.pool.executemany(query, [(news_id, c) for c in channel_ids])
+
+    async def deliver(self, news_id: int, embed: discord.Embed) -> DeliveryReport:
+        async with self._lock:
+            return await self._deliver(news_id, embed)
+
+    async def _deliver(self, news_id: int, embed: discord.Embed) -> DeliveryReport:
+        report = DeliveryReport(news_id)
+        start = time.perf_counter()
+
+        pending, report.skipped = await self._pending_channels(news_id)
+        delivered: list[int] = []
+        unreachable: list[int] = []
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def send(channel_id: int) -> None:
+            channel = self.bot.get_partial_messageable(channel_id)
+            async with semaphore:
+                await self.limiter.acquire()
+                try:
+                    await channel.send(embed=embed)
+                except (discord.Forbidden, discord.NotFound):
+                    unreachable.append(channel_id)
+                    return
+                except discord.HTTPException as e:
+                    log.warning(f"Cannot send news {news_id} to {channel_id}: {e!r}")
+                    report.failed += 1
+                    return
+
+            delivered.append(channel_id)
+            if len(delivered) >= FLUSH_SIZE:
+                batch = delivered[:]
+                delivered.clear()
+                report.sent += len(batch)
+                await self._record(news_id, batch)
+
+        try:
+            await asyncio.gather(*(send(c) for c in pending))
+        finally:
+            # whatever happens, do not send these again
+            report.sent += len(delivered)
+            await self._record(news_id, delivered)
+
+        report.pruned = await self.bot.newsboards.remove(unreachable)
+
+        query = "DELETE FROM news_delivery WHERE delivered_at < NOW() - $1::interval;"
+        await self.bot.pool.execute(query, DELIVERY_RETENTION)
+
+        report.elapsed = time.perf_counter() - start
+        log.info(f"Delivered {report}.")
+        return report
+
+
+class NewsFeed:
+    """The Overwatch news listing.
+
+    The news page is polled with conditional requests and the parsed
+    listing is kept in memory, so that commands never have to scrape it.
+    Delivered news IDs are stored in the news table, thus every post is
+    delivered exactly once even if several went up between two polls.
+    """
+
+    def __init__(self, bot: OverBot) -> None:
+        self.bot: OverBot = bot
+        self.url: str = bot.config.overwatch["news"]
+        # newest first, as listed on the news page
+        self.items: list[News] = []
+        self.updated_at: None | datetime.datetime = None
+        self.delivered: set[int] = set()
+        self._validators: dict[str, str] = {}
+        self._digest: None | str = None
+        self._poll_lock = asyncio.Lock()
+        self._deliver_lock = asyncio.Lock()
+
+    async def load(self) -> None:
+        query = "SELECT delivered_ids FROM news WHERE id = 1;"
+        self.delivered = set(await self.bot.pool.fetchval(query) or ())
+
+    async def poll(self) -> bool:
+        """Fetches the news page and returns whether the listing changed."""
+        async with self._poll_lock:
+            headers = {}
+            if etag := self._validators.get("etag"):
+                headers["If-None-Match"] = etag
+            if last_modified := self._validators.get("last_modified"):
+                headers["If-Modified-Since"] = last_modified
+
+            timeout = aiohttp.ClientTimeout(total=30.0)
+            async with self.bot.session.get(self.url, headers=headers, timeout=timeout) as r:
+                if r.status == 304:
+                    return False
+                r.raise_for_status()
+                content = await r.read()
+
+            self._validators = {}
+            if etag := r.headers.get("ETag"):
+                self._validators["etag"] = etag
+            if last_modified := r.headers.get("Last-Modified"):
+                self._validators["last_modified"] = last_modified
+
+            # the news page is often served without validators
+            digest = hashlib.sha256(content).hexdigest()
+            if digest == self._digest:
+                return False
+
+            items = await asyncio.to_thread(parse_news, content)
+            for item in items:
+                item["id"] = int(NEWS_ID.search(item["link"]).group(0))  # type: ignore
+
+            self.items, self._digest = items, digest
+            self.updated_at = datetime.datetime.now(datetime.UTC)
+            return True
+
+    def pending(self) -> list[News]:
+        """Returns the news that have not been delivered yet, oldest first."""
+        pending = []
+        for item in self.items:
+            # the listing is newest first, everything below a delivered news is old
+            if item["id"] in self.delivered:
+                return pending[::-1]
+            pending.append(item)
+
+        # nothing has ever been delivered or the listing moved past every known news,
+        # either way sending the whole listing would only spam the newsboards
+        return []
+
+    async def _save_delivered(self) -> None:
+        # only the news still listed are needed to tell new news apart
+        listed = {item["id"] for item in self.items}
+        self.delivered &= listed
+        latest = self.items[0]["id"] if self.items else 0
+        query = "UPDATE news SET delivered_ids = $1, latest_id = $2 WHERE id = 1;"
+        await self.bot.pool.execute(query, sorted(self.delivered), latest)
+
+    async def deliver_pending(self) -> list[DeliveryReport]:
+        async with self._deliver_lock:
+            if not self.items:
+                return []
+
+            if not self.delivered.intersection(item["id"] for item in self.items):
+                log.warning("No delivered news in the listing, marking every news as delivered.")
+                self.delivered.update(item["id"] for item in self.items)
+                await self._save_delivered()
+                return []
+
+            reports = []
+            for item in self.pending():
+                reports.append(await self.bot.news_delivery.deliver(item["id"], news_embed(item)))
+                self.delivered.add(item["id"])
+                await self._save_delivered()
+            return reports
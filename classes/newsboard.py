@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+import discord
+
+if TYPE_CHECKING:
+    from bot import OverBot
+
+log = logging.getLogger(__name__)
+
+
+class Newsboard:
+    __slots__ = ("bot", "channel_id", "guild_id", "member_id")
+
+    def __init__(self, bot: OverBot, *, channel_id: int, guild_id: int, member_id: int) -> None:
+        self.bot: OverBot = bot
+        self.channel_id: int = channel_id
+        self.guild_id: int = guild_id
+        self.member_id: int = member_id
+
+    @property
+    def guild(self) -> None | discord.Guild:
+        return self.bot.get_guild(self.guild_id)
+
+    @property
+    def channel(self) -> None | discord.TextChannel:
+        guild = self.guild
+        return guild and guild.get_channel(self.channel_id)  # type: ignore
+
+
+class NewsboardRegistry:
+    """Every newsboard, loaded once at startup.
+
+    This is the authoritative copy: every change goes through here and is
+    written to the database first, so the registry never has to be read
+    back from it.
+    """
+
+    def __init__(self, bot: OverBot) -> None:
+        self.bot: OverBot = bot
+        self._channels: dict[int, Newsboard] = {}
+        self._guilds: dict[int, Newsboard] = {}
+        self._members: dict[int, Newsboard] = {}
+
+    def __len__(self) -> int:
+        return len(self._channels)
+
+    def __iter__(self) -> Iterator[Newsboard]:
+        return iter(tuple(self._channels.values()))
+
+    def __contains__(self, channel_id: int) -> bool:
+        return channel_id in self._channels
+
+    def get(self, guild_id: int) -> None | Newsboard:
+        return self._guilds.get(guild_id)
+
+    def get_by_member(self, member_id: int) -> None | Newsboard:
+        return self._members.get(member_id)
+
+    def _register(self, newsboard: Newsboard) -> None:
+        self._channels[newsboard.channel_id] = newsboard
+        self._guilds[newsboard.guild_id] = newsboard
+        self._members[newsboard.member_id] = newsboard
+
+    def _unregister(self, newsboard: Newsboard) -> None:
+        self._channels.pop(newsboard.channel_id, None)
+        if self._guilds.get(newsboard.guild_id) is newsboard:
+            del self._guilds[newsboard.guild_id]
+        if self._members.get(newsboard.member_id) is newsboard:
+            del self._members[newsboard.member_id]
+
+    async def load(self) -> None:
+        records = await self.bot.pool.fetch("SELECT id, server_id, member_id FROM newsboard;")
+        self._channels.clear()
+        self._guilds.clear()
+        self._members.clear()
+        for record in records:
+            self._register(
+                Newsboard(
+                    self.bot,
+                    channel_id=record["id"],
+                    guild_id=record["server_id"],
+                    member_id=record["member_id"],
+                )
+            )
+        log.info(f"Loaded {len(self)} newsboards.")
+
+    async def add(self, *, channel_id: int, guild_id: int, member_id: int) -> Newsboard:
+        query = "INSERT INTO newsboard (id, server_id, member_id) VALUES ($1, $2, $3);"
+        await self.bot.pool.execute(query, channel_id, guild_id, member_id)
+        newsboard = Newsboard(
+            self.bot, channel_id=channel_id, guild_id=guild_id, member_id=member_id
+        )
+        self._register(newsboard)
+        return newsboard
+
+    async def remove(self, channel_ids: Iterable[int]) -> int:
+        """Removes the given newsboards and returns how many existed."""
+        newsboards = [self._channels[c] for c in channel_ids if c in self._channels]
+        if not newsboards:
+            return 0
+        query = "DELETE FROM newsboard WHERE id = ANY($1::bigint[]);"
+        await self.bot.pool.execute(query, [n.channel_id for n in newsboards])
+        for newsboard in newsboards:
+            self._unregister(newsboard)
+        return len(newsboards)
+
+    async def remove_by_member(self, member_id: int) -> None:
+        await self.bot.pool.execute("DELETE FROM newsboard WHERE member_id = $1;", member_id)
+        for newsboard in [n for n in self._channels.values() if n.member_id == member_id]:
+            self._unregister(newsboard)
+
+    def forget_guilds(self, guild_ids: Iterable[int]) -> None:
+        """Forgets the newsboards of servers deleted from the database.
+
+        Deleting a server cascades to its newsboard, thus no query is needed.
+        """
+        guild_ids = set(guild_ids)
+        for newsboard in [n for n in self._channels.values() if n.guild_id in guild_ids]:
+            self._unregister(newsboard)
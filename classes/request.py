@@ -1,18 +1,34 @@
-from typing import Any
+from collections import Counter
+from functools import partial
+from typing import Any, Callable
 
 import aiohttp
 
 import config
+from utils.cache import ExpiringCache, registry
 
 from .exceptions import (
     BlizzardServerError,
     InternalServerError,
     NotFound,
+    RequestError,
     TooManyAccounts,
     UnknownError,
     ValidationError,
 )
 
+# How long (in seconds) a BattleTag that led to one of the
+# errors below is answered locally instead of hitting the APIs.
+NEGATIVE_RESULT_TTL = 120.0
+
+_negative_results: ExpiringCache = ExpiringCache(
+    NEGATIVE_RESULT_TTL, callback=lambda k, v: _negative_entry.evict()
+)
+_negative_entry = registry.register("request.negative_results", lambda: _negative_results)
+
+# how many times each kind of negative result was served from the cache
+negative_hits: Counter[str] = Counter()
+
 
 class Request:
     __slots__ = ("battletag", "session")
@@ -21,6 +37,30 @@ class Request:
         self.battletag = battletag
         self.session = session
 
+    @property
+    def key(self) -> str:
+        return self.battletag.strip().lower().replace("#", "-")
+
+    def _raise_if_known_failure(self) -> None:
+        try:
+            factory, _ = _negative_results[self.key]
+        except KeyError:
+            _negative_entry.miss()
+            return
+
+        _negative_entry.hit()
+        error = factory()
+        negative_hits[type(error).__name__] += 1
+        raise error
+
+    def _remember_failure(self, error: RequestError) -> None:
+        factory: Callable[[], RequestError]
+        if isinstance(error, TooManyAccounts):
+            factory = partial(TooManyAccounts, error.battletag, error.players)
+        else:
+            factory = type(error)
+        _negative_results[self.key] = factory
+
     async def _resolve_battletag(self, players: list[dict[str, Any]]) -> str:
         if len(players) == 1:
             try:
@@ -70,10 +110,17 @@ class Request:
             except aiohttp.ClientPayloadError:
                 raise UnknownError()
 
+    async def _fetch(self, path: str) -> dict[str, Any]:
+        self._raise_if_known_failure()
+        try:
+            battletag = await self._normalize_battletag()
+            return await self._make_request(path.format(battletag=battletag))
+        except (NotFound, TooManyAccounts, ValidationError) as e:
+            self._remember_failure(e)
+            raise
+
     async def fetch_data(self) -> dict[str, Any]:
-        battletag = await self._normalize_battletag()
-        return await self._make_request(f"/players/{battletag}")
+        return await self._fetch("/players/{battletag}")
 
     async def fetch_summary_data(self) -> dict[str, Any]:
-        battletag = await self._normalize_battletag()
-        return await self._make_request(f"/players/{battletag}/stats/summary")
+        return await self._fetch("/players/{battletag}/stats/summary")
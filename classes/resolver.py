@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable
+
+import discord
+
+from utils.cache import registry
+
+if TYPE_CHECKING:
+    from bot import OverBot
+
+log = logging.getLogger(__name__)
+
+# How long (in seconds) a name fetched from the API is trusted.
+DISPLAY_TTL = 24 * 60 * 60.0
+
+
+class Display:
+    """What is needed to show a user or a guild: its name and icon."""
+
+    __slots__ = ("name", "icon", "resolved_at")
+
+    def __init__(self, name: str, icon: str, resolved_at: float) -> None:
+        self.name: str = name
+        self.icon: str = icon
+        self.resolved_at: float = resolved_at  # unix time
+
+    def __str__(self) -> str:
+        return self.name
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.time() - self.resolved_at < DISPLAY_TTL
+
+    @classmethod
+    def from_user(cls, user: discord.abc.User) -> Display:
+        icon = str(user.display_avatar.replace(size=128, format="webp"))
+        return cls(str(user), icon, time.time())
+
+    @classmethod
+    def from_guild(cls, guild: discord.Guild) -> Display:
+        icon = str(guild.icon.replace(size=128, format="webp")) if guild.icon else ""
+        return cls(str(guild), icon, time.time())
+
+
+class DisplayResolver:
+    """Resolves user and guild IDs to names and icons.
+
+    The gateway cache is looked up first, then names resolved earlier.
+    Users missing from both are fetched concurrently from the API.
+    Everything resolved is persisted, so that leaderboards and the
+    supporters list barely ever need the API, even after a restart.
+    """
+
+    def __init__(
+        self, bot: OverBot, *, filename: str = "data/displays.json", concurrency: int = 5
+    ) -> None:
+        self.bot: OverBot = bot
+        self.filename: str = filename
+        self.concurrency: int = concurrency
+        self.users: dict[int, Display] = {}
+        self.guilds: dict[int, Display] = {}
+        # users that do not exist anymore -> when that has been found out (unix time)
+        self.unknown_users: dict[int, float] = {}
+        self._dirty: bool = False
+        self._users_entry = registry.register("displays.users", lambda: self.users)
+        self._guilds_entry = registry.register("displays.guilds", lambda: self.guilds)
+
+    def dump(self) -> dict[str, dict[str, list[str | float]]]:
+        def serialize(displays: dict[int, Display]) -> dict[str, list[str | float]]:
+            return {str(k): [d.name, d.icon, d.resolved_at] for k, d in displays.items()}
+
+        return {"users": serialize(self.users), "guilds": serialize(self.guilds)}
+
+    def load(self) -> None:
+        """Loads the resolved names. This does blocking I/O."""
+        try:
+            with open(self.filename, "r", encoding="utf-8") as fp:
+                data = json.load(fp)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError):
+            log.exception("Cannot read the resolved names.")
+            return
+
+        self.users = {int(k): Display(*v) for k, v in data.get("users", {}).items()}
+        self.guilds = {int(k): Display(*v) for k, v in data.get("guilds", {}).items()}
+
+    def save(self) -> None:
+        """Atomically writes the resolved names. This does blocking I/O."""
+        Path(self.filename).parent.mkdir(parents=True, exist_ok=True)
+        temp = f"{self.filename}.{uuid.uuid4()}.tmp"
+        with open(temp, "w", encoding="utf-8") as tmp:
+            json.dump(self.dump(), tmp)
+
+        # atomically move the file
+        os.replace(temp, self.filename)
+
+    async def flush(self) -> None:
+        if not self._dirty:
+            return
+        self._dirty = False
+        try:
+            await asyncio.to_thread(self.save)
+        except OSError:
+            log.exception("Cannot write the resolved names.")
+
+    def _remember(self, displays: dict[int, Display], id_: int, display: Display) -> Display:
+        previous = displays.get(id_)
+        if previous is None or (previous.name, previous.icon) != (display.name, display.icon):
+            self._dirty = True
+        displays[id_] = display
+        return display
+
+    async def _fetch_user(self, user_id: int, semaphore: asyncio.Semaphore) -> None | Display:
+        async with semaphore:
+            try:
+                user = await self.bot.fetch_user(user_id)
+            except discord.NotFound:
+                self.unknown_users[user_id] = time.time()
+                return None
+            except discord.HTTPException as e:
+                log.warning(f"Cannot fetch user {user_id}: {e!r}")
+                return None
+        return self._remember(self.users, user_id, Display.from_user(user))
+
+    async def resolve_users(self, user_ids: Iterable[int]) -> dict[int, Display]:
+        """Resolves the given users, those that cannot be resolved are left out."""
+        resolved: dict[int, Display] = {}
+        missing = []
+        for user_id in user_ids:
+            if (user := self.bot.get_user(user_id)) is not None:
+                resolved[user_id] = self._remember(self.users, user_id, Display.from_user(user))
+            elif (display := self.users.get(user_id)) is not None and display.is_fresh:
+                self._users_entry.hit()
+                resolved[user_id] = display
+            elif time.time() - self.unknown_users.get(user_id, 0.0) < DISPLAY_TTL:
+                self._users_entry.hit()
+            else:
+                self._users_entry.miss()
+                missing.append(user_id)
+
+        if missing:
+            semaphore = asyncio.Semaphore(self.concurrency)
+            displays = await asyncio.gather(*(self._fetch_user(u, semaphore) for u in missing))
+            for user_id, display in zip(missing, displays):
+                # rather show an outdated name than none at all
+                display = display or self.users.get(user_id)
+                if display is not None:
+                    resolved[user_id] = display
+
+        await self.flush()
+        return resolved
+
+    async def resolve_guilds(self, guild_ids: Iterable[int]) -> dict[int, Display]:
+        """Resolves the given guilds.
+
+        Guilds cannot be fetched unless the bot is in them, thus
+        the last known name is used for those the bot left.
+        """
+        resolved: dict[int, Display] = {}
+        for guild_id in guild_ids:
+            if (guild := self.bot.get_guild(guild_id)) is not None:
+                resolved[guild_id] = self._remember(
+                    self.guilds, guild_id, Display.from_guild(guild)
+                )
+            elif (display := self.guilds.get(guild_id)) is not None:
+                self._guilds_entry.hit()
+                resolved[guild_id] = display
+            else:
+                self._guilds_entry.miss()
+
+        await self.flush()
+        return resolved
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+import datetime
+import gzip
+import hashlib
+import json
+from typing import Any
+
+
+class Snapshot:
+    """A JSON document serialized and compressed once, then served or pushed as is."""
+
+    __slots__ = ("body", "gzipped", "etag", "created_at")
+
+    def __init__(self, payload: Any) -> None:
+        self.body: bytes = json.dumps(payload, separators=(",", ":")).encode()
+        self.gzipped: bytes = gzip.compress(self.body)
+        self.etag: str = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+        self.created_at: datetime.datetime = datetime.datetime.now(datetime.UTC)
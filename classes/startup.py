@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Callable, Coroutine, Iterable
+
+PhaseFunc = Callable[[], Coroutine[Any, Any, Any]]
+
+
+class Phase:
+    __slots__ = ("name", "func", "requires", "elapsed")
+
+    def __init__(self, name: str, func: PhaseFunc, *, requires: tuple[str, ...]) -> None:
+        self.name: str = name
+        self.func: PhaseFunc = func
+        self.requires: tuple[str, ...] = requires
+        self.elapsed: None | float = None
+
+
+class StartupGraph:
+    """Runs startup phases concurrently while respecting their dependencies.
+
+    A phase starts as soon as every phase it requires has completed.
+    Dependencies must be added before the phases requiring them, thus
+    the graph can never contain a cycle.
+    """
+
+    def __init__(self) -> None:
+        self.phases: dict[str, Phase] = {}
+        self.elapsed: float = 0.0
+
+    def add(self, name: str, func: PhaseFunc, *, requires: Iterable[str] = ()) -> None:
+        requires = tuple(requires)
+        for requirement in requires:
+            if requirement not in self.phases:
+                raise ValueError(f"Phase {name} requires unknown phase {requirement}.")
+        self.phases[name] = Phase(name, func, requires=requires)
+
+    async def _run_phase(self, phase: Phase, tasks: dict[str, asyncio.Task[None]]) -> None:
+        if phase.requires:
+            await asyncio.gather(*(tasks[r] for r in phase.requires))
+        start = time.perf_counter()
+        try:
+            await phase.func()
+        finally:
+            phase.elapsed = time.perf_counter() - start
+
+    async def run(self) -> None:
+        start = time.perf_counter()
+        tasks: dict[str, asyncio.Task[None]] = {}
+        for name, phase in self.phases.items():
+            tasks[name] = asyncio.create_task(self._run_phase(phase, tasks), name=f"startup:{name}")
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+        finally:
+            self.elapsed = time.perf_counter() - start
+
+    def report(self) -> str:
+        lines = []
+        for phase in self.phases.values():
+            elapsed = "skipped" if phase.elapsed is None else f"{phase.elapsed * 1000:.1f}ms"
+            requires = f" (after {', '.join(phase.requires)})" if phase.requires else ""
+            lines.append(f"  {phase.name:<14} {elapsed:>10}{requires}")
+        lines.append(f"  {'total':<14} {self.elapsed * 1000:>8.1f}ms")
+        return "\n".join(lines)
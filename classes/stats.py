@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import discord
+
+
+class Counters:
+    """Guild, member and channel counts of a guild, a shard or the whole bot."""
+
+    __slots__ = ("guilds", "members", "large", "text", "voice")
+
+    def __init__(self) -> None:
+        self.guilds: int = 0
+        self.members: int = 0
+        self.large: int = 0
+        self.text: int = 0
+        self.voice: int = 0
+
+    def apply(self, other: Counters, sign: int = 1) -> None:
+        self.guilds += sign * other.guilds
+        self.members += sign * other.members
+        self.large += sign * other.large
+        self.text += sign * other.text
+        self.voice += sign * other.voice
+
+    @classmethod
+    def from_guild(cls, guild: discord.Guild) -> Counters:
+        self = cls()
+        self.guilds = 1
+        self.members = guild.member_count or 0
+        self.large = int(guild.large)
+        for channel in guild.channels:
+            if isinstance(channel, discord.TextChannel):
+                self.text += 1
+            elif isinstance(channel, discord.VoiceChannel):
+                self.voice += 1
+        return self
+
+
+class BotCounters:
+    """Per shard counters kept up to date from gateway events.
+
+    The contribution of every guild is remembered, so that a guild
+    can be updated or removed without walking the whole guild list.
+    Reading the counters is O(shards).
+    """
+
+    def __init__(self) -> None:
+        self.shards: dict[int, Counters] = {}
+        self._guilds: dict[int, tuple[int, Counters]] = {}
+
+    def __len__(self) -> int:
+        return len(self._guilds)
+
+    def get(self, shard_id: int) -> Counters:
+        return self.shards.setdefault(shard_id, Counters())
+
+    def total(self) -> Counters:
+        total = Counters()
+        for counters in self.shards.values():
+            total.apply(counters)
+        return total
+
+    def add_guild(self, guild: discord.Guild) -> None:
+        self.remove_guild(guild)
+        counters = Counters.from_guild(guild)
+        self._guilds[guild.id] = (guild.shard_id, counters)
+        self.get(guild.shard_id).apply(counters)
+
+    def remove_guild(self, guild: discord.Guild) -> None:
+        try:
+            shard_id, counters = self._guilds.pop(guild.id)
+        except KeyError:
+            return
+        self.get(shard_id).apply(counters, -1)
+
+    def update_members(self, guild: discord.Guild) -> None:
+        try:
+            shard_id, counters = self._guilds[guild.id]
+        except KeyError:
+            return
+        members = guild.member_count or 0
+        large = int(guild.large)
+        shard = self.get(shard_id)
+        shard.members += members - counters.members
+        shard.large += large - counters.large
+        counters.members, counters.large = members, large
+
+    def update_channels(self, channel: discord.abc.GuildChannel, sign: int) -> None:
+        try:
+            shard_id, counters = self._guilds[channel.guild.id]
+        except KeyError:
+            return
+        shard = self.get(shard_id)
+        if isinstance(channel, discord.TextChannel):
+            counters.text += sign
+            shard.text += sign
+        elif isinstance(channel, discord.VoiceChannel):
+            counters.voice += sign
+            shard.voice += sign
+
+    def rebuild(self, guilds: list[discord.Guild]) -> None:
+        """Recounts everything from scratch, used when (re)connecting."""
+        self.shards.clear()
+        self._guilds.clear()
+        for guild in guilds:
+            self.add_guild(guild)
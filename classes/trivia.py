@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import itertools
+import json
+import random
+from typing import Any
+
+from utils.cache import ExpiringCache
+
+# How long (in seconds) the questions a member has seen are remembered.
+SEEN_TTL = 24 * 60 * 60.0
+
+# Random picks tried before looking for the unseen questions one by one.
+MAX_PICKS = 8
+
+
+class Question:
+    __slots__ = (
+        "index",
+        "question",
+        "image_url",
+        "correct_answer",
+        "wrong_answers",
+        "category",
+        "difficulty",
+    )
+
+    def __init__(self, index: int, data: dict[str, Any]) -> None:
+        self.index: int = index
+        self.question: str = data["question"]
+        self.image_url: None | str = data.get("image_url")
+        self.correct_answer: str = data["correct_answer"]
+        self.wrong_answers: tuple[str, ...] = tuple(data["wrong_answers"])
+        self.category: None | str = data.get("category")
+        self.difficulty: None | str = data.get("difficulty")
+
+    @property
+    def entries(self) -> list[str]:
+        return [self.correct_answer, *self.wrong_answers]
+
+
+class QuestionBank:
+    """Trivia questions, loaded once and indexed by category and difficulty.
+
+    The questions a member has already been asked are kept in a bitset
+    (one bit per question), so that they are not asked again until every
+    question matching the filters has been seen.
+    """
+
+    def __init__(self, questions: list[dict[str, Any]]) -> None:
+        self.questions: tuple[Question, ...] = tuple(
+            Question(i, q) for i, q in enumerate(questions)
+        )
+        self.categories: tuple[str, ...] = tuple(
+            sorted({q.category for q in self.questions if q.category})
+        )
+        self.difficulties: tuple[str, ...] = tuple(
+            sorted({q.difficulty for q in self.questions if q.difficulty})
+        )
+
+        # (category, difficulty) -> (question indexes, bitmask of those), None means any
+        self._pools: dict[tuple[None | str, None | str], tuple[tuple[int, ...], int]] = {}
+        for category, difficulty in itertools.product(
+            (None, *self.categories), (None, *self.difficulties)
+        ):
+            indexes = tuple(
+                q.index
+                for q in self.questions
+                if category in (None, q.category) and difficulty in (None, q.difficulty)
+            )
+            mask = sum(1 << i for i in indexes)
+            self._pools[(category, difficulty)] = (indexes, mask)
+
+        # member ID -> bitset of the questions already asked
+        self.seen: ExpiringCache = ExpiringCache(seconds=SEEN_TTL)
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    @classmethod
+    def from_file(cls, filename: str = "assets/questions.json") -> QuestionBank:
+        """Loads the questions. This does blocking I/O."""
+        with open(filename, encoding="utf-8") as fp:
+            return cls(json.load(fp))
+
+    def pick(
+        self, member_id: int, *, category: None | str = None, difficulty: None | str = None
+    ) -> None | Question:
+        """Returns a question the member has not seen yet, or None if none matches the filters."""
+        try:
+            indexes, mask = self._pools[(category, difficulty)]
+        except KeyError:
+            return None
+        if not indexes:
+            return None
+
+        try:
+            seen: int = self.seen[member_id][0]
+        except KeyError:
+            seen = 0
+
+        if seen & mask == mask:
+            # every question has been seen, start over
+            seen &= ~mask
+
+        for _ in range(MAX_PICKS):
+            index = random.choice(indexes)
+            if not seen >> index & 1:
+                break
+        else:
+            # only a few questions are left unseen
+            index = random.choice([i for i in indexes if not seen >> i & 1])
+
+        self.seen[member_id] = seen | 1 << index
+        return self.questions[index]
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import hmac
+import logging
+from typing import TYPE_CHECKING
+
+from aiohttp import web
+from discord.ext import commands
+
+if TYPE_CHECKING:
+    from bot import OverBot
+
+log = logging.getLogger(__name__)
+
+# How long (in seconds) clients may reuse a document, it is refreshed every 30 seconds.
+MAX_AGE = 30
+
+
+class API(commands.Cog):
+    """Serves the documents pushed to private API, so that they can be polled instead.
+
+    Every response is a precomputed snapshot, thus a request costs O(1).
+    """
+
+    def __init__(self, bot: OverBot) -> None:
+        self.bot = bot
+        self.config: dict[str, str | int | bool] = getattr(bot.config, "local_api", {})
+        self.runner: None | web.AppRunner = None
+
+    async def cog_load(self) -> None:
+        if not self.config.get("enabled"):
+            return
+
+        app = web.Application()
+        app.router.add_get("/health", self.health)
+        app.router.add_get("/ready", self.ready)
+        app.router.add_get("/{endpoint}", self.document)
+
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        host, port = self.config.get("host", "127.0.0.1"), self.config.get("port", 8080)
+        site = web.TCPSite(self.runner, str(host), int(port))
+        await site.start()
+        log.info(f"Local API listening on {host}:{port}.")
+
+    async def cog_unload(self) -> None:
+        if self.runner is not None:
+            await self.runner.cleanup()
+
+    def is_authorized(self, request: web.Request) -> bool:
+        token = str(self.config.get("token") or "")
+        if not token:
+            return True
+        return hmac.compare_digest(request.headers.get("Authorization", ""), token)
+
+    async def health(self, request: web.Request) -> web.Response:
+        """Liveness probe, the process is up and serving requests."""
+        return web.json_response({"status": "ok"})
+
+    async def ready(self, request: web.Request) -> web.Response:
+        """Readiness probe, the bot is connected and the documents are available."""
+        shards = {shard.id + 1: not shard.is_closed() for shard in self.bot.shards.values()}
+        ready = self.bot.is_ready() and all(shards.values()) and bool(self.bot.snapshots)
+        payload = {"ready": ready, "shards": shards, "documents": sorted(self.bot.snapshots)}
+        return web.json_response(payload, status=200 if ready else 503)
+
+    async def document(self, request: web.Request) -> web.Response:
+        if not self.is_authorized(request):
+            raise web.HTTPUnauthorized()
+
+        snapshot = self.bot.snapshots.get(request.match_info["endpoint"])
+        if snapshot is None:
+            raise web.HTTPNotFound()
+
+        headers = {
+            "ETag": snapshot.etag,
+            "Last-Modified": snapshot.created_at.strftime("%a, %d %b %Y %H:%M:%S GMT"),
+            "Cache-Control": f"max-age={MAX_AGE}",
+            "Vary": "Accept-Encoding",
+        }
+        if snapshot.etag in request.headers.get("If-None-Match", ""):
+            return web.Response(status=304, headers=headers)
+
+        if "gzip" in request.headers.get("Accept-Encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            body = snapshot.gzipped
+        else:
+            body = snapshot.body
+        return web.Response(body=body, headers=headers, content_type="application/json")
+
+
+async def setup(bot: OverBot) -> None:
+    await bot.add_cog(API(bot))
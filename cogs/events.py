@@ -10,8 +10,6 @@ from discord.ext import commands
 if TYPE_CHECKING:
     from bot import OverBot
 
-    from .overwatch import Overwatch
-
 log = logging.getLogger(__name__)
 
 
@@ -46,11 +44,42 @@ class Events(commands.Cog):
         if not hasattr(self.bot, "uptime"):
             setattr(self.bot, "uptime", datetime.datetime.now(datetime.UTC))
 
+        # fix any drift caused by events missed while disconnected
+        self.bot.counters.rebuild(self.bot.guilds)
+        removed, inserted = await self.bot.reconcile_guilds()
+        if removed or inserted:
+            log.info(f"Reconciled servers: {removed} removed, {inserted} inserted.")
+
         log.info(f"Connected as {self.bot.user.display_name} in {len(self.bot.guilds)} guilds.")
         await self.send_log("Bot is online.", discord.Color.blue())
 
+    @commands.Cog.listener()
+    async def on_guild_available(self, guild: discord.Guild) -> None:
+        self.bot.counters.add_guild(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_unavailable(self, guild: discord.Guild) -> None:
+        self.bot.counters.remove_guild(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_update(self, before: discord.Guild, after: discord.Guild) -> None:
+        self.bot.counters.add_guild(after)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member) -> None:
+        self.bot.counters.update_members(member.guild)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member) -> None:
+        self.bot.counters.update_members(member.guild)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel: discord.abc.GuildChannel) -> None:
+        self.bot.counters.update_channels(channel, 1)
+
     @commands.Cog.listener()
     async def on_guild_join(self, guild: discord.Guild) -> None:
+        self.bot.counters.add_guild(guild)
         query = """INSERT INTO server (id)
                    VALUES ($1)
                    ON CONFLICT (id) DO NOTHING;
@@ -65,7 +94,9 @@ class Events(commands.Cog):
 
     @commands.Cog.listener()
     async def on_guild_remove(self, guild: discord.Guild) -> None:
+        self.bot.counters.remove_guild(guild)
         await self.bot.pool.execute("DELETE FROM server WHERE id = $1;", guild.id)
+        self.bot.newsboards.forget_guilds((guild.id,))
 
         if self.bot.debug:
             return
@@ -90,17 +121,13 @@ class Events(commands.Cog):
 
     @commands.Cog.listener()
     async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel) -> None:
-        if not isinstance(channel, discord.TextChannel):
-            return
+        self.bot.counters.update_channels(channel, -1)
 
-        overwatch: Overwatch = self.bot.get_cog("Overwatch")  # type: ignore
-        newsboard = await overwatch.get_newsboard(channel.guild.id)
-        if newsboard.channel_id != channel.id:
+        if not isinstance(channel, discord.TextChannel):
             return
 
-        async with self.bot.pool.acquire(timeout=300.0) as conn:
-            query = "DELETE FROM newsboard WHERE id = $1;"
-            await conn.execute(query, channel.id)
+        if channel.id in self.bot.newsboards:
+            await self.bot.newsboards.remove((channel.id,))
 
     @commands.Cog.listener()
     async def on_entitlement_create(self, entitlement: discord.Entitlement) -> None:
@@ -1,77 +1,65 @@
 from __future__ import annotations
 
 import secrets
-from typing import TYPE_CHECKING, Literal
+from typing import TYPE_CHECKING
 
 import discord
 from discord import app_commands
 from discord.ext import commands
 
+from utils.helpers import gamemode_autocomplete, role_autocomplete
+
 if TYPE_CHECKING:
     from bot import OverBot
 
-HeroCategories = Literal["damage", "support", "tank"]
-MapCategories = Literal[
-    "assault",
-    "capture-the-flag",
-    "control",
-    "deathmatch",
-    "elimination",
-    "escort",
-    "hybrid",
-    "push",
-    "team-deathmatch",
-]
-
 
 class Fun(commands.Cog):
     def __init__(self, bot: OverBot) -> None:
         self.bot = bot
 
-    def _get_random_hero(self, category: None | str) -> str:
-        heroes = list(self.bot.heroes.values())
-        if not category:
-            hero = secrets.choice(heroes)
-        else:
-            categorized_heroes = [h for h in heroes if h["role"] == category]
-            hero = secrets.choice(categorized_heroes)
-        return hero["name"]
+    def _get_random_hero(self, category: None | str) -> None | str:
+        catalog = self.bot.catalog
+        heroes = catalog.heroes_by_role.get(category, ()) if category else catalog.all_heroes
+        if not heroes:
+            return None
+        return secrets.choice(heroes)["name"]
 
-    def _get_random_map(self, category: None | str) -> str:
-        maps = list(self.bot.maps.values())
-        if not category:
-            map_ = secrets.choice(maps)
-        else:
-            categorized_maps = [m for m in maps if category in m["gamemodes"]]
-            map_ = secrets.choice(categorized_maps)
-        return map_["name"]
+    def _get_random_map(self, category: None | str) -> None | str:
+        catalog = self.bot.catalog
+        maps = catalog.maps_by_gamemode.get(category, ()) if category else catalog.all_maps
+        if not maps:
+            return None
+        return secrets.choice(maps)["name"]
 
     @app_commands.command()
+    @app_commands.autocomplete(category=role_autocomplete)
     @app_commands.describe(category="The category to get a random hero from")
     async def herotoplay(
-        self, interaction: discord.Interaction, category: HeroCategories = None
+        self, interaction: discord.Interaction, category: None | str = None
     ) -> None:
         """Returns a random hero."""
         hero = self._get_random_hero(category)
-        await interaction.response.send_message(hero)
+        await interaction.response.send_message(hero or f"No heroes found for **{category}**.")
 
     @app_commands.command()
+    @app_commands.autocomplete(category=role_autocomplete)
     @app_commands.describe(category="The category to get a random hero from")
     async def goldengun(
-        self, interaction: discord.Interaction, category: HeroCategories = None
+        self, interaction: discord.Interaction, category: None | str = None
     ) -> None:
         """Returns a hero to get a golden gun for."""
         hero = self._get_random_hero(category)
-        await interaction.response.send_message(hero)
+        await interaction.response.send_message(hero or f"No heroes found for **{category}**.")
 
     @app_commands.command()
+    @app_commands.autocomplete(category=gamemode_autocomplete)
     @app_commands.describe(category="The category to get a random map from")
     async def maptoplay(
-        self, interaction: discord.Interaction, category: MapCategories = None
+        self, interaction: discord.Interaction, category: None | str = None
     ) -> None:
         """Returns a random map."""
         map_ = self._get_random_map(category)
-        await interaction.response.send_message(map_)
+        await interaction.response.send_message(map_ or f"No maps found for **{category}**.")
 
     @app_commands.command()
     async def roletoplay(self, interaction: discord.Interaction) -> None:
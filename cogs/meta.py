@@ -7,16 +7,13 @@ import time
 from typing import TYPE_CHECKING
 
 import discord
-import distro
-import psutil
-import pygit2
 from discord import app_commands, ui
 from discord.ext import commands
-from pygit2.enums import SortMode
 
 from utils.helpers import command_autocomplete
 
 if TYPE_CHECKING:
+    import pygit2
     from asyncpg import Record
 
     from bot import OverBot
@@ -49,37 +46,13 @@ class Meta(commands.Cog):
             await interaction.followup.send(embed=embed, view=view)
             return
 
-        actual = self.bot.tree.get_command(command.split(" ")[0])
-
-        if isinstance(actual, app_commands.Group):
-            split = command.split(" ")
-            try:
-                split[1]
-            except IndexError:
-                actual = actual.get_command(split[0])
-            else:
-                actual = actual.get_command(split[1])
-
-        if not actual:
+        metadata = self.bot.tree.metadata.get(command)
+        if metadata is None:
             await interaction.followup.send(f"command **{command}** not found.")
             return
 
-        assert isinstance(actual, app_commands.Command)
-        signature = " ".join(map(lambda p: f"`{p.name}`", actual.parameters))
-
-        embed = discord.Embed(color=self.bot.get_user_color(interaction.user.id))
-        embed.title = f"/{actual.qualified_name} {signature}"
-        embed.description = actual.description
-
-        parameters = []
-        for p in actual.parameters:
-            tmp = f"`{p.name}`: {p.description}{' [**R**]' if p.required else ' [**O**]'}"
-            parameters.append(tmp)
-
-        if parameters:
-            embed.set_footer(text="[R] = Required / [O] = Optional")
-            embed.add_field(name="Parameters", value="\n".join(parameters))
-
+        embed = metadata.embed.copy()
+        embed.colour = self.bot.get_user_color(interaction.user.id)
         await interaction.followup.send(embed=embed, view=view)
 
     @app_commands.command()
@@ -108,6 +81,10 @@ class Meta(commands.Cog):
         return f"[`{str(commit.id)[:6]}`](https://github.com/davidetacchini/overbot/commit/{str(commit.id)}) {message} ({offset})"
 
     def get_latest_commits(self, count: int = 3) -> str:
+        # pygit2 is only needed here, import it lazily to keep the extension load fast
+        import pygit2
+        from pygit2.enums import SortMode
+
         repo = pygit2.Repository(".git")
         commits = list(itertools.islice(repo.walk(repo.head.target, SortMode.TOPOLOGICAL), count))
         return "\n".join(self.format_commit(c) for c in commits)
@@ -135,31 +112,19 @@ class Meta(commands.Cog):
             icon_url=self.bot.owner.display_avatar.url,
         )
 
-        activity = f"{psutil.cpu_percent()}% CPU\n{psutil.virtual_memory()[2]}% RAM\n"
+        metrics = self.bot.host_metrics
+        if (latest := metrics.latest) is not None:
+            activity = f"{latest.cpu_percent}% CPU\n{latest.ram_percent}% RAM\n"
+        else:
+            activity = "N/A"
 
-        os_name = distro.linux_distribution()[0]
-        os_version = distro.linux_distribution()[1]
         py_version = platform.python_version()
         pg_version = await self.bot.get_pg_version()
-        host = f"{os_name} {os_version}\n" f"Python {py_version}\n" f"PostgreSQL {pg_version}"
+        host = f"{metrics.os_name}\n" f"Python {py_version}\n" f"PostgreSQL {pg_version}"
 
         total_commands = await self.bot.total_commands()
-        total_members = 0
-
-        text = 0
-        voice = 0
-        guilds = 0
-        for guild in self.bot.guilds:
-            guilds += 1
-            try:
-                total_members += guild.member_count or 0
-            except AttributeError:
-                pass
-            for channel in guild.channels:
-                if isinstance(channel, discord.TextChannel):
-                    text += 1
-                elif isinstance(channel, discord.VoiceChannel):
-                    voice += 1
+        counters = self.bot.counters.total()
+        text, voice = counters.text, counters.voice
 
         embed.add_field(name="Process", value=activity)
         embed.add_field(name="Host", value=host)
@@ -167,8 +132,8 @@ class Meta(commands.Cog):
             name="Channels",
             value=f"{text + voice} total\n{text} text\n{voice} voice",
         )
-        embed.add_field(name="Members", value=total_members)
-        embed.add_field(name="Servers", value=len(self.bot.guilds))
+        embed.add_field(name="Members", value=counters.members)
+        embed.add_field(name="Servers", value=counters.guilds)
         embed.add_field(
             name="Shards", value=f"{interaction.guild.shard_id + 1}/{self.bot.shard_count}"  # type: ignore
         )
@@ -202,9 +167,11 @@ class Meta(commands.Cog):
         embed.url = f"{self.bot.config.website}/#servers"
         embed.set_footer(text="Tracking command usage since - 03/31/2021")
 
+        displays = await self.bot.displays.resolve_guilds(g["guild_id"] for g in guilds)
+
         board = []
         for index, guild in enumerate(guilds, start=1):
-            g = self.bot.get_guild(guild["guild_id"])
+            g = displays.get(guild["guild_id"])
             if not g:
                 continue
             board.append(f"{index}. **{str(g)}** ran a total of **{guild['commands']}** commands")
@@ -1,36 +1,39 @@
 from __future__ import annotations
 
+import asyncio
 from typing import TYPE_CHECKING, Any
 
+import aiohttp
 import discord
 from discord import app_commands
 from discord.ext import commands
 
 from classes.exceptions import UnknownError
 from classes.ui import BaseView
-from utils.cache import cache
+from utils.cache import registry
 from utils.checks import is_premium
 from utils.helpers import gamemode_autocomplete, hero_autocomplete, map_autocomplete
-from utils.scrape import get_overwatch_news
 
 if TYPE_CHECKING:
-    from asyncpg import Record
-
     from bot import OverBot
 
 
-class HeroInfoView(BaseView):
-    def __init__(self, *, interaction: discord.Interaction, data: dict[str, Any]) -> None:
-        super().__init__(interaction=interaction)
-        self.bot: OverBot = getattr(interaction, "client")
+class HeroPages:
+    """Ability and story pages of a hero, built once and then reused."""
+
+    __slots__ = ("data", "_abilities", "_story")
+
+    def __init__(self, data: dict[str, Any]) -> None:
         self.data = data
+        self._abilities: None | list[discord.Embed] = None
+        self._story: None | list[discord.Embed] = None
 
-    @discord.ui.button(label="Abilities", style=discord.ButtonStyle.blurple)
-    async def abilities(self, interaction: discord.Interaction, button: discord.ui.Button) -> None:
-        abilities = self.data.get("abilities")
-        if not abilities:
-            return
+    @property
+    def abilities(self) -> list[discord.Embed]:
+        if self._abilities is not None:
+            return self._abilities
 
+        abilities = self.data.get("abilities") or []
         pages = []
         for index, ability in enumerate(abilities, start=1):
             embed = discord.Embed()
@@ -43,13 +46,18 @@ class HeroInfoView(BaseView):
             embed.set_footer(text=f"Page {index} of {len(abilities)}")
             pages.append(embed)
 
-        await self.bot.paginate(pages, interaction=interaction)
+        self._abilities = pages
+        return pages
+
+    @property
+    def story(self) -> list[discord.Embed]:
+        if self._story is not None:
+            return self._story
 
-    @discord.ui.button(label="Story", style=discord.ButtonStyle.blurple)
-    async def story(self, interaction: discord.Interaction, button: discord.ui.Button) -> None:
         story = self.data.get("story")
         if not story:
-            return
+            self._story = []
+            return self._story
 
         chapters = story.get("chapters")
         max_pages = len(chapters) + 1
@@ -72,7 +80,25 @@ class HeroInfoView(BaseView):
             embed.set_footer(text=f"Page {index} of {max_pages}")
             pages.append(embed)
 
-        await self.bot.paginate(pages, interaction=interaction)
+        self._story = pages
+        return pages
+
+
+class HeroInfoView(BaseView):
+    def __init__(self, *, interaction: discord.Interaction, pages: HeroPages) -> None:
+        super().__init__(interaction=interaction)
+        self.bot: OverBot = getattr(interaction, "client")
+        self.pages = pages
+
+    @discord.ui.button(label="Abilities", style=discord.ButtonStyle.blurple)
+    async def abilities(self, interaction: discord.Interaction, button: discord.ui.Button) -> None:
+        if pages := self.pages.abilities:
+            await self.bot.paginate(pages, interaction=interaction)
+
+    @discord.ui.button(label="Story", style=discord.ButtonStyle.blurple)
+    async def story(self, interaction: discord.Interaction, button: discord.ui.Button) -> None:
+        if pages := self.pages.story:
+            await self.bot.paginate(pages, interaction=interaction)
 
     @discord.ui.button(label="Quit", style=discord.ButtonStyle.red)
     async def quit(self, interaction: discord.Interaction, button: discord.ui.Button) -> None:
@@ -81,27 +107,11 @@ class HeroInfoView(BaseView):
         self.stop()
 
 
-class Newsboard:
-    __slots__ = ("guild_id", "bot", "record", "channel_id", "member_id")
-
-    def __init__(self, guild_id: int, bot: OverBot, *, record: None | Record = None) -> None:
-        self.guild_id = guild_id
-        self.bot = bot
-        self.channel_id: None | int = None
-
-        if record:
-            self.channel_id = record["id"]
-            self.member_id: int = record["member_id"]
-
-    @property
-    def channel(self) -> None | discord.TextChannel:
-        guild = self.bot.get_guild(self.guild_id)
-        return guild and guild.get_channel(self.channel_id)  # type: ignore
-
-
 class Overwatch(commands.Cog):
     def __init__(self, bot: OverBot) -> None:
         self.bot = bot
+        self.hero_pages: dict[str, HeroPages] = {}
+        registry.register("overwatch.hero_pages", lambda: self.hero_pages)
 
     info = app_commands.Group(
         name="info", description="Provides information about heroes, maps or gamemodes."
@@ -121,13 +131,22 @@ class Overwatch(commands.Cog):
         """Shows the latest Overwatch news."""
         pages = []
 
+        feed = self.bot.news_feed
         try:
-            news = await get_overwatch_news(session=self.bot.session)
+            if not feed.items:
+                await interaction.response.defer(thinking=True)
+                await feed.poll()
+            news = feed.items
+            if not news:
+                raise ValueError("No news found.")
         except Exception:
             embed = discord.Embed(color=self.bot.get_user_color(interaction.user.id))
             url = self.bot.config.overwatch["news"]
             embed.description = f"[Latest Overwatch News]({url})"
-            await interaction.response.send_message(embed=embed)
+            if interaction.response.is_done():
+                await interaction.followup.send(embed=embed)
+            else:
+                await interaction.response.send_message(embed=embed)
             return
 
         for i, n in enumerate(news, start=1):
@@ -158,17 +177,6 @@ class Overwatch(commands.Cog):
         embed.description = " - ".join(description)
         await interaction.response.send_message(embed=embed)
 
-    @cache()
-    async def get_newsboard(self, guild_id: int) -> Newsboard:
-        query = "SELECT * FROM newsboard WHERE server_id = $1;"
-        record = await self.bot.pool.fetchrow(query, guild_id)
-        return Newsboard(guild_id, self.bot, record=record)
-
-    async def _has_newsboard(self, member_id: int) -> None | discord.Guild:
-        query = "SELECT server_id FROM newsboard WHERE member_id = $1;"
-        guild_id = await self.bot.pool.fetchval(query, member_id)
-        return self.bot.get_guild(guild_id)
-
     @app_commands.command(extras=dict(premium=True))
     @app_commands.checks.has_permissions(manage_channels=True)
     @app_commands.checks.bot_has_permissions(manage_channels=True)
@@ -183,19 +191,18 @@ class Overwatch(commands.Cog):
 
         assert interaction.guild is not None
 
-        newsboard = await self.get_newsboard(interaction.guild_id)
-        if newsboard.channel is not None:
+        newsboard = self.bot.newsboards.get(interaction.guild_id)
+        if newsboard is not None and newsboard.channel is not None:
             await interaction.followup.send(
                 f"This server already has a newsboard at {newsboard.channel.mention}."
             )
             return
 
-        if guild := await self._has_newsboard(interaction.user.id):
+        newsboard = self.bot.newsboards.get_by_member(interaction.user.id)
+        if newsboard is not None and (guild := newsboard.guild):
             payload = f"You have already set up a newsboard in **{str(guild)}**. Do you want to override it?"
             if await self.bot.prompt(interaction, payload):
-                query = "DELETE FROM newsboard WHERE member_id = $1;"
-                await self.bot.pool.execute(query, interaction.user.id)
-                self.get_newsboard.invalidate(self, interaction.guild_id)
+                await self.bot.newsboards.remove_by_member(interaction.user.id)
             else:
                 return
 
@@ -219,15 +226,27 @@ class Overwatch(commands.Cog):
             await interaction.followup.send("Something bad happened. Please try again.")
             return
 
-        query = "INSERT INTO newsboard (id, server_id, member_id) VALUES ($1, $2, $3);"
-        await self.bot.pool.execute(query, channel.id, interaction.guild_id, interaction.user.id)
+        await self.bot.newsboards.add(
+            channel_id=channel.id, guild_id=interaction.guild.id, member_id=interaction.user.id
+        )
         await interaction.followup.send(f"Channel successfully created at {channel.mention}.")
 
+    def get_hero_pages(self, key: str, data: dict[str, Any]) -> HeroPages:
+        pages = self.hero_pages.get(key)
+        # rebuild the pages only when the hero details have been fetched again
+        if pages is None or pages.data is not data:
+            pages = HeroPages(data)
+            self.hero_pages[key] = pages
+        return pages
+
     async def embed_map_info(self, map_: dict[Any, Any]) -> discord.Embed:
         embed = discord.Embed()
         embed.title = map_.get("name")
         embed.set_image(url=map_.get("screenshot"))
-        gamemodes = "\n".join(map(lambda m: m.capitalize(), map_.get("gamemodes")))  # type: ignore
+        lookup = self.bot.catalog.gamemodes_by_key
+        gamemodes = "\n".join(
+            lookup[g]["name"] if g in lookup else g.capitalize() for g in map_.get("gamemodes", ())
+        )
         embed.add_field(name="Gamemodes", value=gamemodes)
         embed.add_field(name="Location", value=map_.get("location"))
         embed.add_field(name="Country Code", value=map_.get("country_code", "N/A"))
@@ -246,14 +265,14 @@ class Overwatch(commands.Cog):
     @app_commands.describe(name="The name of the hero to see information for")
     async def hero(self, interaction: discord.Interaction, name: str) -> None:
         """Returns information about a given hero."""
-        url = f"{self.bot.BASE_URL}/heroes/{name}"
-        async with self.bot.session.get(url) as r:
-            if r.status == 422:
-                await interaction.response.send_message(f"Hero **{name}** not found.")
-                return
-            elif r.status != 200:
-                raise UnknownError()
-            data = await r.json()
+        try:
+            data = await self.bot.catalog.get_hero(name, session=self.bot.session)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            raise UnknownError() from None
+
+        if data is None:
+            await interaction.response.send_message(f"Hero **{name}** not found.")
+            return
 
         embed = discord.Embed(color=self.bot.get_user_color(interaction.user.id))
         embed.set_author(name=data.get("name"), icon_url=data.get("portrait"))
@@ -265,7 +284,7 @@ class Overwatch(commands.Cog):
         embed.add_field(name="Role", value=data.get("role").capitalize())
         embed.add_field(name="Location", value=data.get("location"))
 
-        view = HeroInfoView(interaction=interaction, data=data)
+        view = HeroInfoView(interaction=interaction, pages=self.get_hero_pages(name, data))
         await interaction.response.send_message(embed=embed, view=view)
 
     @info.command()
@@ -286,7 +305,7 @@ class Overwatch(commands.Cog):
     @app_commands.describe(name="The name of the gamemode to see information for")
     async def gamemode(self, interaction: discord.Interaction, name: str) -> None:
         """Returns information about a given gamemode."""
-        gamemode = self.bot.gamemodes.get(name)
+        gamemode = self.bot.catalog.gamemodes_by_key.get(name)
         if not gamemode:
             await interaction.response.send_message(f"Gamemode **{name}** not found.")
             return
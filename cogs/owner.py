@@ -19,9 +19,12 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
+from classes.news import news_embed
+from utils.cache import registry
 from utils.checks import is_owner
-from utils.helpers import module_autocomplete
+from utils.helpers import cache_autocomplete, module_autocomplete
 from utils.scrape import get_overwatch_news_from_ids
+from utils.time import human_timedelta
 
 if TYPE_CHECKING:
     from bot import OverBot
@@ -43,6 +46,7 @@ class Owner(commands.Cog):
     sql = app_commands.Group(name="sql", description="Executes SQL queries.")
     sync = app_commands.Group(name="sync", description="Sync stuff.")
     entitlement = app_commands.Group(name="entitlement", description="Manage entitlements.")
+    cache = app_commands.Group(name="cache", description="Inspect and manage caches.")
 
     @app_commands.command()
     @is_owner()
@@ -103,6 +107,22 @@ class Owner(commands.Cog):
         else:
             await interaction.followup.send("Configuration successfully reloaded.")
 
+    @reload.command()
+    @is_owner()
+    async def questions(self, interaction: discord.Interaction) -> None:
+        """Reloads the trivia questions."""
+        await interaction.response.defer(thinking=True)
+        trivia = self.bot.get_cog("Trivia")
+        if trivia is None:
+            await interaction.followup.send("Trivia module is not loaded.")
+            return
+        try:
+            total = await trivia.load_questions()  # type: ignore
+        except Exception as e:
+            await interaction.followup.send(f"""```prolog\n{type(e).__name__}\n{e}```""")
+        else:
+            await interaction.followup.send(f"{total} trivia questions successfully reloaded.")
+
     # Credits to https://github.com/Rapptz/RoboDanny
     @reload.command()
     @is_owner()
@@ -153,8 +173,7 @@ class Owner(commands.Cog):
             "\n".join(f"{status} `{module}`" for status, module in statuses)
         )
         # update sloc because it most likely has been changed
-        self.bot.sloc = 0
-        self.bot.compute_sloc()
+        self.bot.sloc = await asyncio.to_thread(self.bot.compute_sloc)
 
     async def run_process(self, command: str) -> list:
         try:
@@ -354,71 +373,40 @@ class Owner(commands.Cog):
         If a guild quit when the bot was offline, then remove it from database.
         If a guild joined when the bot was offline, then add it to database.
         """
-        await interaction.response.send_message("Checking for guilds to remove...", ephemeral=True)
-        db_guilds = await self.bot.pool.fetch("SELECT id FROM server;")
-        db_guild_ids = [g["id"] for g in db_guilds]
-        actual_guild_ids = [g.id for g in self.bot.guilds]
-        ret = []
-
-        # DELETE
-        total = 0
-        for guild_id in db_guild_ids:
-            if guild_id not in actual_guild_ids:
-                total += 1
-                await self.bot.pool.execute("DELETE FROM server WHERE id = $1;", guild_id)
-        ret.append(f"{total} guild(s) removed.")
-
-        await interaction.edit_original_response(content="Checking for guilds to insert...")
-
-        # INSERT
-        total = 0
-        for guild_id in actual_guild_ids:
-            if guild_id not in db_guild_ids:
-                total += 1
-                query = """INSERT INTO server (id) VALUES ($1)
-                           ON CONFLICT (id) DO NOTHING;
-                        """
-                await self.bot.pool.execute(query, guild_id)
-        ret.append(f"{total} guild(s) inserted.")
-        await interaction.followup.send("\n".join(ret), ephemeral=True)
+        await interaction.response.defer(thinking=True, ephemeral=True)
+        removed, inserted = await self.bot.reconcile_guilds()
+        await interaction.followup.send(
+            f"{removed} guild(s) removed.\n{inserted} guild(s) inserted.", ephemeral=True
+        )
 
     @sync.command()
     @is_owner()
-    async def news(self, interaction: discord.Interaction, raw_ids: str) -> None:
+    async def news(
+        self,
+        interaction: discord.Interaction,
+        raw_ids: str,
+        concurrency: app_commands.Range[int, 1, 16] = 4,
+    ) -> None:
         """Send unsent news to server newsboards."""
         await interaction.response.defer(thinking=True)
 
-        ids = raw_ids.split(",")
+        ids = [idx.strip() for idx in raw_ids.split(",") if idx.strip()]
+        news, failed = await get_overwatch_news_from_ids(
+            ids, session=self.bot.session, limit=concurrency
+        )
 
-        try:
-            news = await get_overwatch_news_from_ids(ids, session=self.bot.session)
-        except Exception as e:
-            log.exception(e)
-            await interaction.followup.send(f"```prolog\n{e}```")
-            return
+        reports = []
+        for idx, error in failed.items():
+            log.warning(f"Cannot fetch news {idx}: {error!r}")
+            reports.append(f"news {idx}: cannot be fetched ({error!r})")
 
-        records = await self.bot.pool.fetch("SELECT id FROM newsboard;")
-        for n in news:
-            embed = discord.Embed()
-            embed.title = n["title"]
-            embed.url = n["link"]
-            embed.set_author(name="Blizzard Entertainment")
-            embed.set_image(url=n["thumbnail"])
-            embed.set_footer(text=n["date"])
-
-            for record in records:
-                channel_id = record["id"]
-                channel = self.bot.get_channel(channel_id)
-                if not channel or not isinstance(channel, discord.TextChannel):
-                    continue
-                try:
-                    await channel.send(embed=embed)
-                except discord.Forbidden:
-                    continue
+        for idx, n in news.items():
+            report = await self.bot.news_delivery.deliver(int(idx), news_embed(n))
+            reports.append(str(report))
 
-        message = f"**{len(ids)}** news successfully sent to **{len(records)}** channels."
+        message = "\n".join(reports)
         log.info(message)
-        await interaction.followup.send(message)
+        await interaction.followup.send(f"```prolog\n{message}```")
 
     @app_commands.command()
     @is_owner()
@@ -506,6 +494,81 @@ class Owner(commands.Cog):
 
         await self.bot.paginate(pages, interaction=interaction)
 
+    @staticmethod
+    def format_bytes(size: int) -> str:
+        for unit in ("B", "KiB", "MiB"):
+            if size < 1024:
+                return f"{size:.0f}{unit}" if unit == "B" else f"{size:.2f}{unit}"
+            size /= 1024  # type: ignore
+        return f"{size:.2f}GiB"
+
+    @cache.command(name="stats")
+    @is_owner()
+    async def cache_stats(self, interaction: discord.Interaction) -> None:
+        """Shows size, memory usage and hit ratio of every cache."""
+        await interaction.response.defer(thinking=True)
+
+        entries = sorted(registry, key=lambda e: e.name)
+        if not entries:
+            await interaction.followup.send("No caches registered.")
+            return
+
+        pages = []
+        for chunk in discord.utils.as_chunks(entries, max_size=9):
+            embed = discord.Embed(color=self.bot.get_user_color(self.bot.owner_id))
+            embed.title = f"Caches ({len(entries)} total)"
+            for entry in chunk:
+                age = human_timedelta(entry.populated_at, brief=True, suffix=False)
+                value = (
+                    f"Size: **{entry.size}**\n"
+                    f"Memory: **~{self.format_bytes(entry.estimated_bytes)}**\n"
+                    f"Hits/Misses: **{entry.hits}/{entry.misses}** ({entry.hit_ratio:.0%})\n"
+                    f"Evictions: **{entry.evictions}**\n"
+                    f"Age: **{age}**"
+                )
+                embed.add_field(name=entry.name, value=value)
+            pages.append(embed)
+
+        await self.bot.paginate(pages, interaction=interaction)
+
+    @cache.command(name="warm")
+    @app_commands.autocomplete(name=cache_autocomplete)
+    @is_owner()
+    async def cache_warm(self, interaction: discord.Interaction, name: str) -> None:
+        """Repopulates a cache."""
+        entry = registry.get(name)
+        if entry is None:
+            await interaction.response.send_message(f"Cache **{name}** not found.")
+            return
+
+        if not entry.can_warm:
+            await interaction.response.send_message(f"Cache **{name}** cannot be warmed.")
+            return
+
+        await interaction.response.defer(thinking=True)
+        try:
+            await entry.warm()
+        except Exception as e:
+            await interaction.followup.send(f"""```prolog\n{type(e).__name__}\n{e}```""")
+        else:
+            await interaction.followup.send(f"Cache **{name}** warmed ({entry.size} entries).")
+
+    @cache.command(name="flush")
+    @app_commands.autocomplete(name=cache_autocomplete)
+    @is_owner()
+    async def cache_flush(self, interaction: discord.Interaction, name: str) -> None:
+        """Empties a cache."""
+        entry = registry.get(name)
+        if entry is None:
+            await interaction.response.send_message(f"Cache **{name}** not found.")
+            return
+
+        removed = entry.flush()
+        log.info(f"Cache {name} flushed ({removed} entries removed).")
+        await interaction.response.send_message(
+            f"Cache **{name}** flushed ({removed} entries removed)."
+        )
+
 
 async def setup(bot: OverBot) -> None:
     await bot.add_cog(Owner(bot), guild=bot.TEST_GUILD)
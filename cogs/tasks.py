@@ -1,17 +1,18 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 import logging
 import platform
-import re
+import time
 from typing import TYPE_CHECKING, Any
 
+import aiohttp
 import discord
-import distro
-import psutil
-from discord.app_commands import Group as AppCommandsGroup
 from discord.ext import commands, tasks
 
-from utils.scrape import get_overwatch_news
+from classes.snapshot import Snapshot
 
 if TYPE_CHECKING:
     from bot import OverBot
@@ -22,41 +23,57 @@ if TYPE_CHECKING:
 
 log = logging.getLogger(__name__)
 
+# Statistics that change on every call, they alone do not warrant a push.
+VOLATILE_HOST_STATS = ("CPU Percent", "CPU Frequency", "RAM Usage")
+VOLATILE_BOT_STATS = ("Uptime", "Websocket latency")
+
+# How long (in seconds) an unchanged payload can go without being pushed.
+MAX_PUSH_INTERVAL = 5 * 60.0
+
+
+def digest(payload: Any) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+class PushState:
+    __slots__ = ("digest", "pushed_at", "pushed", "failures", "sent_bytes", "elapsed")
+
+    def __init__(self) -> None:
+        self.digest: None | str = None
+        self.pushed_at: float = 0.0
+        self.pushed: int = 0
+        self.failures: int = 0
+        self.sent_bytes: int = 0
+        self.elapsed: float = 0.0
+
 
 class Tasks(commands.Cog):
     def __init__(self, bot: OverBot) -> None:
         self.bot = bot
+        # endpoint -> state of the last push to the private API
+        self.pushes: dict[str, PushState] = {}
         self.update_private_api.start()
         self.send_overwatch_news.start()
         self.update_bot_presence.start()
+        self.refresh_catalog.start()
 
     def get_shards(self) -> Shards:
         shards = []
         for shard in self.bot.shards.values():
-            guilds = [g for g in self.bot.guilds if g.shard_id == shard.id]
-            try:
-                total_members = sum(g.member_count for g in guilds if g.member_count)
-            except (AttributeError, TypeError):
-                total_members = 0
+            counters = self.bot.counters.get(shard.id)
             shards.append(
                 {
                     "id": shard.id + 1,
                     "latency": round(shard.latency * 1000, 2),
-                    "guild_count": len(guilds),
-                    "member_count": total_members,
+                    "guild_count": counters.guilds,
+                    "member_count": counters.members,
                 }
             )
         return shards
 
     async def get_bot_stats(self) -> BotStats:
         total_commands = await self.bot.total_commands()
-
-        try:
-            total_members = sum(g.member_count for g in self.bot.guilds if g.member_count)
-        except (AttributeError, TypeError):
-            total_members = 0
-
-        large_servers = sum(1 for g in self.bot.guilds if g.large)
+        counters = self.bot.counters.total()
 
         try:
             shards = self.get_shards()
@@ -67,34 +84,29 @@ class Tasks(commands.Cog):
 
         pg_version = await self.bot.get_pg_version()
 
-        os_name = distro.linux_distribution()[0]
-        os_version = distro.linux_distribution()[1]
-
-        # it seems psutil is unable to read cpu_freq when running docker on top of M1 chip.
-        try:
-            cpu_frequency = f"{round(psutil.cpu_freq()[0] / 1000, 2)}GHz"
-        except TypeError:
+        host = self.bot.host_metrics
+        latest = host.latest
+        cpu_percent, ram_usage = host.average(60.0)
+        if latest is not None and latest.cpu_frequency is not None:
+            cpu_frequency = f"{latest.cpu_frequency}GHz"
+        else:
             cpu_frequency = "N/A"
 
-        cpu_percent = f"{psutil.cpu_percent()}%"
-        cpu_cores = psutil.cpu_count()
-        ram_usage = f"{psutil.virtual_memory()[2]}%"
-
         return {
             "host": {
                 "Postgres": pg_version,
                 "Python": platform.python_version(),
-                "OS": os_name + " " + os_version,
-                "CPU Percent": cpu_percent,
-                "CPU Cores": cpu_cores,
+                "OS": host.os_name,
+                "CPU Percent": "N/A" if cpu_percent is None else f"{cpu_percent}%",
+                "CPU Cores": host.cpu_cores,
                 "CPU Frequency": cpu_frequency,
-                "RAM Usage": ram_usage,
+                "RAM Usage": "N/A" if ram_usage is None else f"{ram_usage}%",
             },
             "bot": {
-                "Servers": len(self.bot.guilds),
+                "Servers": counters.guilds,
                 "Shards": self.bot.shard_count,
-                "Members": total_members,
-                "Large servers": large_servers,
+                "Members": counters.members,
+                "Large servers": counters.large,
                 "Commands runned": total_commands,
                 "Uptime": str(self.bot.get_uptime(brief=True)),
                 "Websocket latency": ping,
@@ -105,47 +117,11 @@ class Tasks(commands.Cog):
         }
 
     def get_bot_commands(self) -> BotCommands:
-        all_commands = []
-
-        def get_command_type(command):
-            # App Commands does not have 'type' attribute
-            try:
-                command.type
-            except AttributeError:
-                return "App Command"
-            else:
-                return "Context Menu"
-
-        context_menus = self.bot.tree.get_commands(type=discord.AppCommandType.user)
-        for command in context_menus:
-            all_commands.append(
-                {
-                    "cog": getattr(command, "__cog_name__"),
-                    "name": command.qualified_name,
-                    "type": get_command_type(command),
-                    "is_premium": command.extras.get("premium", False),
-                    "description": command.callback.__doc__,
-                    "guild_only": False,
-                }
-            )
-
-        for cog_name, cog in self.bot.cogs.items():
-            if cog_name.lower() == "owner":
-                continue
-            for command in cog.walk_app_commands():
-                if isinstance(command, AppCommandsGroup):
-                    continue  # groups are not commands
-                all_commands.append(
-                    {
-                        "cog": cog_name,
-                        "name": command.qualified_name,
-                        "type": get_command_type(command),
-                        "is_premium": command.extras.get("premium", False),
-                        "description": command.description or "No description found...",
-                        "guild_only": command.guild_only,
-                    }
-                )
-
+        tree = self.bot.tree
+        all_commands = [m.to_dict() for m in tree.context_menus.values()]
+        all_commands.extend(
+            m.to_dict() for m in tree.metadata.values() if (m.cog or "").lower() != "owner"
+        )
         return all_commands
 
     async def get_top_servers(self) -> TopServers:
@@ -171,111 +147,116 @@ class Tasks(commands.Cog):
         return servers
 
     async def get_supporters(self) -> Supporters:
+        # skip my profile
+        ids = [i for i in self.bot.premiums if i != self.bot.config.owner_id]
+        guild_ids = [i for i in ids if self.bot.get_guild(i) is not None]
+        guilds = await self.bot.displays.resolve_guilds(guild_ids)
+        users = await self.bot.displays.resolve_users(i for i in ids if i not in guilds)
+
         supporters = []
-        for id_ in self.bot.premiums:
-            if id_ == self.bot.config.owner_id:  # skip my profile
-                continue
-            guild = self.bot.get_guild(id_)
-            if guild is not None:
-                icon = str(guild.icon.replace(size=128, format="webp")) if guild.icon else ""
+        for is_server, displays in ((True, guilds), (False, users)):
+            for id_, display in displays.items():
                 supporters.append(
                     {
                         "id": id_,
-                        "name": str(guild),
-                        "icon": icon,
-                        "is_server": True,
+                        "name": display.name,
+                        "icon": display.icon,
+                        "is_server": is_server,
                     }
                 )
-            else:
-                try:
-                    user = self.bot.get_user(id_) or (await self.bot.fetch_user(id_))
-                except Exception:
-                    pass
-                else:
-                    icon = str(user.display_avatar.replace(size=128, format="webp"))
-                    supporters.append(
-                        {
-                            "id": id_,
-                            "name": str(user),
-                            "icon": icon,
-                            "is_server": False,
-                        }
-                    )
         return supporters
 
-    @tasks.loop(seconds=30.0)
-    async def update_private_api(self):
-        """POST bot stats to private API."""
-        await self.bot.wait_until_ready()
+    @staticmethod
+    def _stable_stats(stats: BotStats) -> BotStats:
+        """Returns the statistics without the values that change on every call."""
+        host = {k: v for k, v in stats["host"].items() if k not in VOLATILE_HOST_STATS}
+        bot = {k: v for k, v in stats["bot"].items() if k not in VOLATILE_BOT_STATS}
+        shards = [{k: v for k, v in s.items() if k != "latency"} for s in stats["shards"]]
+        return {"host": host, "bot": bot, "shards": shards}
+
+    async def _push(self, url: str, snapshot: Snapshot, *, digest: str) -> None:
+        endpoint = url.rsplit("/", 1)[-1]
+        state = self.pushes.setdefault(endpoint, PushState())
+
+        # unchanged payloads are still pushed once in a while, so that uptime and such stay fresh
+        if state.digest == digest and time.monotonic() - state.pushed_at < MAX_PUSH_INTERVAL:
+            return
 
         headers = {
             "Content-Type": "application/json",
+            "Content-Encoding": "gzip",
             "Authorization": self.bot.config.obapi["token"],
         }
+        timeout = aiohttp.ClientTimeout(total=10.0)
+
+        start = time.perf_counter()
+        try:
+            async with self.bot.session.post(
+                url, data=snapshot.gzipped, headers=headers, timeout=timeout
+            ) as r:
+                r.raise_for_status()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            state.failures += 1
+            log.warning(f"Cannot push {endpoint} to the private API: {e!r}")
+        else:
+            state.digest = digest
+            state.pushed_at = time.monotonic()
+            state.pushed += 1
+            state.sent_bytes += len(snapshot.gzipped)
+        finally:
+            state.elapsed = time.perf_counter() - start
 
-        stats = await self.get_bot_stats()
+    @tasks.loop(seconds=30.0)
+    async def update_private_api(self):
+        """Snapshot bot stats and POST the ones that changed to private API."""
+        await self.bot.wait_until_ready()
+
+        stats, servers, supporters = await asyncio.gather(
+            self.get_bot_stats(), self.get_top_servers(), self.get_supporters()
+        )
         commands = self.get_bot_commands()
-        servers = await self.get_top_servers()
-        supporters = await self.get_supporters()
 
-        if self.bot.debug:
-            try:
-                BASE_URL = self.bot.config.obapi["dev"]
-            except KeyError:
-                return
-        else:
-            BASE_URL = self.bot.config.obapi["prod"]
+        payloads = {
+            "statistics": (stats, self._stable_stats(stats)),
+            "commands": (commands, commands),
+            "servers": (servers, servers),
+            "supporters": (supporters, supporters),
+        }
+        # also served as is by the local API, if enabled
+        for endpoint, (payload, _) in payloads.items():
+            self.bot.snapshots[endpoint] = Snapshot(payload)
+
+        BASE_URL = self.bot.config.obapi.get("dev" if self.bot.debug else "prod")
+        if not BASE_URL:
+            return
 
-        await self.bot.session.post(f"{BASE_URL}/statistics", json=stats, headers=headers)
-        await self.bot.session.post(f"{BASE_URL}/commands", json=commands, headers=headers)
-        await self.bot.session.post(f"{BASE_URL}/servers", json=servers, headers=headers)
-        await self.bot.session.post(f"{BASE_URL}/supporters", json=supporters, headers=headers)
+        # the loop never overlaps itself, the timeouts bound how late the next iteration can be
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(
+                self._push(
+                    f"{BASE_URL}/{endpoint}", self.bot.snapshots[endpoint], digest=digest(stable)
+                )
+                for endpoint, (_, stable) in payloads.items()
+            )
+        )
+        log.debug(f"Private API updated in {(time.perf_counter() - start) * 1000:.1f}ms.")
 
     @tasks.loop(minutes=5.0)
     async def send_overwatch_news(self):
-        if self.bot.debug:
-            return
-
         await self.bot.wait_until_ready()
 
         try:
-            news = (await get_overwatch_news(session=self.bot.session))[0]
-        except Exception:
+            await self.bot.news_feed.poll()
+        except Exception as e:
+            log.warning(f"Cannot poll Overwatch news: {e!r}")
             return
 
-        # get the news id from the URL
-        latest_news_id = re.search(r"\d+", news["link"]).group(0)  # type: ignore
-
-        # check whether the scraped news id is equals to the
-        # one stored in the file; if not then there's a news
-        db_news_id = await self.bot.pool.fetchval("SELECT latest_id FROM news WHERE id = 1;")
-
-        if int(latest_news_id) == int(db_news_id):
+        if self.bot.debug:
             return
 
-        embed = discord.Embed()
-        embed.title = news["title"]
-        embed.url = news["link"]
-        embed.set_author(name="Blizzard Entertainment")
-        embed.set_image(url=news["thumbnail"])
-        embed.set_footer(text=news["date"])
-
-        records = await self.bot.pool.fetch("SELECT id FROM newsboard;")
-        for record in records:
-            channel_id = record["id"]
-            channel = self.bot.get_channel(channel_id)
-            if not channel or not isinstance(channel, discord.TextChannel):
-                continue
-            try:
-                await channel.send(embed=embed)
-            except discord.Forbidden:
-                continue
-
-        # update old news_id with latest one
-        await self.bot.pool.execute(
-            "UPDATE news SET latest_id = $1 WHERE id = 1", int(latest_news_id)
-        )
-        log.info(f"Sent news with ID {latest_news_id} in {len(records)} servers.")
+        # also retries news whose delivery has been interrupted
+        await self.bot.news_feed.deliver_pending()
 
     @tasks.loop(hours=1.0)
     async def update_bot_presence(self):
@@ -283,10 +264,21 @@ class Tasks(commands.Cog):
         game = discord.Game("/help")
         await self.bot.change_presence(activity=game)
 
+    @tasks.loop(hours=1.0)
+    async def refresh_catalog(self):
+        """Refresh heroes, maps and gamemodes, so that new ones show up without a restart."""
+        await self.bot.catalog.wait_until_loaded()
+        await self.bot.catalog.refresh(session=self.bot.session)
+        # so that /info hero never has to wait for the API
+        fetched = await self.bot.catalog.prewarm_heroes(session=self.bot.session)
+        if fetched:
+            log.info(f"Prewarmed details of {fetched} heroes.")
+
     def cog_unload(self) -> None:
         self.update_private_api.cancel()
         self.send_overwatch_news.cancel()
         self.update_bot_presence.cancel()
+        self.refresh_catalog.cancel()
 
 
 async def setup(bot: OverBot) -> None:
@@ -1,24 +1,26 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import logging
 import random
-import secrets
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Literal
 
 import discord
+from asyncpg import PostgresConnectionError
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 
 from classes.exceptions import NoChoice, NoTriviaStats
+from classes.trivia import Question, QuestionBank
 from classes.ui import BaseView
 
 if TYPE_CHECKING:
-    from asyncpg import Record
-
     from bot import OverBot
 
 Member = discord.User | discord.Member
 
+log = logging.getLogger(__name__)
+
 
 class SelectAnswer(discord.ui.Select):
     def __init__(self) -> None:
@@ -30,17 +32,150 @@ class SelectAnswer(discord.ui.Select):
         self.view.stop()  # type: ignore
 
 
+class RoundSelect(discord.ui.Select["RoundView"]):
+    def __init__(self, entries: list[str]) -> None:
+        super().__init__(placeholder="Select the correct answer...")
+        for entry in entries:
+            self.add_option(label=entry)
+
+    async def callback(self, interaction: discord.Interaction) -> None:
+        assert self.view is not None
+        answers = self.view.answers
+        if interaction.user.id in answers:
+            await interaction.response.send_message("You already answered.", ephemeral=True)
+            return
+        answers[interaction.user.id] = self.values[0]
+        await interaction.response.send_message(
+            f"Your answer **{self.values[0]}** has been recorded.", ephemeral=True
+        )
+
+
+class RoundView(discord.ui.View):
+    """A single select that every member of the channel can answer once."""
+
+    def __init__(self, entries: list[str], *, timeout: float) -> None:
+        super().__init__(timeout=timeout)
+        # member ID -> answer, only the first answer counts
+        self.answers: dict[int, str] = {}
+        self.add_item(RoundSelect(entries))
+
+
 class Trivia(commands.Cog):
     def __init__(self, bot: OverBot) -> None:
         self.bot = bot
+        self.bank: QuestionBank = QuestionBank([])
+        self._batch_lock = asyncio.Lock()
+        # games not written to the database yet, as [started, won, lost] deltas
+        # keyed by member ID, and by (guild ID, member ID) for the guild stats
+        self._pending: dict[int, list[int]] = {}
+        self._pending_guilds: dict[tuple[int, int], list[int]] = {}
+        # channels with a round going on
+        self._rounds: set[int] = set()
+
+        self.bulk_upsert_loop.add_exception_type(PostgresConnectionError)
+        self.bulk_upsert_loop.start()
+        self.refresh_leaderboards.add_exception_type(PostgresConnectionError)
+        self.refresh_leaderboards.start()
 
     trivia = app_commands.Group(name="trivia", description="Play Overwatch trivia")
 
-    def get_question(self) -> dict[str, Any]:
-        with open("assets/questions.json") as fp:
-            questions: list[dict[str, Any]] = json.loads(fp.read())
-        shuffled = random.sample(questions, len(questions))
-        return secrets.choice(shuffled)
+    async def cog_load(self) -> None:
+        await self.load_questions()
+
+    async def cog_unload(self) -> None:
+        self.bulk_upsert_loop.cancel()
+        self.refresh_leaderboards.cancel()
+        # do not lose the games played since the last flush
+        async with self._batch_lock:
+            await self.bulk_upsert()
+
+    async def bulk_upsert(self) -> None:
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, {}
+        pending_guilds, self._pending_guilds = self._pending_guilds, {}
+
+        query = """INSERT INTO trivia (id, started, won, lost)
+                   SELECT * FROM unnest($1::bigint[], $2::int[], $3::int[], $4::int[])
+                   ON CONFLICT (id) DO
+                   UPDATE SET started = trivia.started + excluded.started,
+                              won = trivia.won + excluded.won,
+                              lost = trivia.lost + excluded.lost;
+                """
+        guild_query = """INSERT INTO trivia_guild (guild_id, member_id, started, won, lost)
+                         SELECT * FROM unnest(
+                             $1::bigint[], $2::bigint[], $3::int[], $4::int[], $5::int[]
+                         )
+                         ON CONFLICT (guild_id, member_id) DO
+                         UPDATE SET started = trivia_guild.started + excluded.started,
+                                    won = trivia_guild.won + excluded.won,
+                                    lost = trivia_guild.lost + excluded.lost;
+                      """
+        ids = list(pending)
+        started, won, lost = (list(column) for column in zip(*pending.values()))
+        try:
+            async with self.bot.pool.acquire() as conn, conn.transaction():
+                await conn.execute(query, ids, started, won, lost)
+                if pending_guilds:
+                    guild_ids, member_ids = (list(c) for c in zip(*pending_guilds))
+                    started, won, lost = (list(c) for c in zip(*pending_guilds.values()))
+                    await conn.execute(guild_query, guild_ids, member_ids, started, won, lost)
+        except BaseException:
+            # put the deltas back, they will be written on the next flush. This
+            # includes the loop being cancelled on unload, which flushes again
+            for member_id, delta in pending.items():
+                self._add(self._pending, member_id, delta)
+            for key, delta in pending_guilds.items():
+                self._add(self._pending_guilds, key, delta)
+            raise
+
+        if len(ids) > 1:
+            log.info(f"Updated trivia stats of {len(ids)} members.")
+
+    @tasks.loop(seconds=10.0)
+    async def bulk_upsert_loop(self) -> None:
+        await self.bot.wait_until_ready()
+
+        async with self._batch_lock:
+            try:
+                await self.bulk_upsert()
+            except PostgresConnectionError:
+                # retried by the loop
+                raise
+            except Exception:
+                # the deltas have been put back, keep draining them
+                log.exception("Cannot update trivia stats.")
+
+    @tasks.loop(minutes=5.0)
+    async def refresh_leaderboards(self) -> None:
+        await self.bot.wait_until_ready()
+
+        # readers keep using the old leaderboards while they are being refreshed
+        query = "REFRESH MATERIALIZED VIEW CONCURRENTLY trivia_leaderboard;"
+        try:
+            await self.bot.pool.execute(query)
+        except PostgresConnectionError:
+            # retried by the loop
+            raise
+        except Exception:
+            log.exception("Cannot refresh trivia leaderboards.")
+
+    @staticmethod
+    def _add(pending: dict[Any, list[int]], key: Any, delta: list[int]) -> None:
+        current = pending.setdefault(key, [0, 0, 0])
+        for i, value in enumerate(delta):
+            current[i] += value
+
+    def _record(self, member_id: int, guild_id: None | int, delta: list[int]) -> None:
+        self._add(self._pending, member_id, delta)
+        if guild_id is not None:
+            self._add(self._pending_guilds, (guild_id, member_id), delta)
+
+    async def load_questions(self) -> int:
+        """Loads the question bank from disk, members start over with unseen questions."""
+        self.bank = await asyncio.to_thread(QuestionBank.from_file)
+        return len(self.bank)
 
     async def get_answer(
         self,
@@ -68,32 +203,25 @@ class Trivia(commands.Cog):
         else:
             return choice
 
-    async def get_result(self, interaction: discord.Interaction, question: dict[str, Any]) -> bool:
-        entries = [question["correct_answer"]] + question["wrong_answers"]
+    async def get_result(self, interaction: discord.Interaction, question: Question) -> bool:
+        entries = question.entries
         shuffled = random.sample(entries, len(entries))
         timeout = 45.0
         embed = discord.Embed(color=self.bot.get_user_color(interaction.user.id))
-        embed.description = f'**{question["question"]}**' + "\n\n"  # separate from choices
-        if question["image_url"]:
-            embed.set_image(url=question["image_url"])
+        embed.description = f"**{question.question}**" + "\n\n"  # separate from choices
+        if question.image_url:
+            embed.set_image(url=question.image_url)
         embed.set_footer(text=f"You have 1 try and {timeout} seconds to respond.")
         answer = await self.get_answer(shuffled, embed, interaction=interaction, timeout=timeout)
-        return bool(answer == question["correct_answer"])
+        return bool(answer == question.correct_answer)
 
-    async def update_member_games_started(self, member_id: int) -> None:
-        query = """INSERT INTO trivia (id, started)
-                   VALUES ($1, 1)
-                   ON CONFLICT (id) DO
-                   UPDATE SET started = trivia.started + 1;
-                """
-        await self.bot.pool.execute(query, member_id)
+    def update_member_games_started(self, member_id: int, guild_id: None | int) -> None:
+        self._record(member_id, guild_id, [1, 0, 0])
 
-    async def update_member_stats(self, member_id: int, *, won: bool = True) -> None:
-        if won:
-            query = "UPDATE trivia SET won = won + 1 WHERE id = $1;"
-        else:
-            query = "UPDATE trivia SET lost = lost + 1 WHERE id = $1;"
-        await self.bot.pool.execute(query, member_id)
+    def update_member_stats(
+        self, member_id: int, guild_id: None | int, *, won: bool = True
+    ) -> None:
+        self._record(member_id, guild_id, [0, 1, 0] if won else [0, 0, 1])
 
     def embed_result(
         self, member: Member, *, won: bool = True, correct_answer: None | str = None
@@ -111,11 +239,21 @@ class Trivia(commands.Cog):
             embed.add_field(name="Correct answer", value=correct_answer)
         return embed
 
-    async def get_member_stats(self, member: Member) -> Record:
-        query = "SELECT * FROM trivia WHERE id = $1;"
-        member_stats = await self.bot.pool.fetchrow(query, member.id)
-        if not member_stats:
+    async def get_member_stats(self, member: Member) -> dict[str, int]:
+        query = "SELECT started, won, lost FROM trivia WHERE id = $1;"
+        # a flush in progress has already taken the deltas out of the buffer
+        # but has not committed them yet, wait for it to be over
+        async with self._batch_lock:
+            record = await self.bot.pool.fetchrow(query, member.id)
+            delta = self._pending.get(member.id)
+        if not record and not delta:
             raise NoTriviaStats()
+
+        member_stats = dict(record) if record else {"started": 0, "won": 0, "lost": 0}
+        if delta:
+            # games not written to the database yet
+            for key, value in zip(("started", "won", "lost"), delta):
+                member_stats[key] = (member_stats[key] or 0) + value
         return member_stats
 
     def get_player_ratio(self, won: int, lost: int) -> float | int:
@@ -126,7 +264,7 @@ class Trivia(commands.Cog):
         except ZeroDivisionError:
             return 0
 
-    def embed_member_stats(self, member: Member, stats: Record) -> discord.Embed:
+    def embed_member_stats(self, member: Member, stats: dict[str, int]) -> discord.Embed:
         embed = discord.Embed(color=self.bot.get_user_color(member.id))
         embed.set_author(name=str(member), icon_url=member.display_avatar)
         unanswered = stats["started"] - (stats["won"] + stats["lost"])
@@ -141,18 +279,85 @@ class Trivia(commands.Cog):
     @trivia.command()
     async def play(self, interaction: discord.Interaction) -> None:
         """Play an Overwatch trivia game."""
-        question = self.get_question()
-        await self.update_member_games_started(interaction.user.id)
+        question = self.bank.pick(interaction.user.id)
+        if question is None:
+            await interaction.response.send_message("No trivia questions are available.")
+            return
+        self.update_member_games_started(interaction.user.id, interaction.guild_id)
         if await self.get_result(interaction, question):
-            await self.update_member_stats(interaction.user.id)
+            self.update_member_stats(interaction.user.id, interaction.guild_id)
             await interaction.followup.send(embed=self.embed_result(interaction.user))
         else:
-            await self.update_member_stats(interaction.user.id, won=False)
+            self.update_member_stats(interaction.user.id, interaction.guild_id, won=False)
             embed = self.embed_result(
-                interaction.user, won=False, correct_answer=question["correct_answer"]
+                interaction.user, won=False, correct_answer=question.correct_answer
             )
             await interaction.followup.send(embed=embed)
 
+    @trivia.command()
+    @app_commands.guild_only()
+    async def round(self, interaction: discord.Interaction) -> None:
+        """Play an Overwatch trivia round everyone in the channel can answer."""
+        assert interaction.channel_id is not None
+        if interaction.channel_id in self._rounds:
+            await interaction.response.send_message(
+                "A round is already going on in this channel.", ephemeral=True
+            )
+            return
+
+        # questions are not repeated within the same channel
+        question = self.bank.pick(interaction.channel_id)
+        if question is None:
+            await interaction.response.send_message("No trivia questions are available.")
+            return
+
+        entries = question.entries
+        shuffled = random.sample(entries, len(entries))
+        timeout = 30.0
+        view = RoundView(shuffled, timeout=timeout)
+
+        embed = discord.Embed(color=self.bot.get_user_color(interaction.user.id))
+        embed.title = "Trivia Round"
+        embed.description = f"**{question.question}**\n\n" + "\n".join(
+            f"{index}. {entry}" for index, entry in enumerate(shuffled, start=1)
+        )
+        if question.image_url:
+            embed.set_image(url=question.image_url)
+        embed.set_footer(text=f"Everyone has 1 try and {timeout} seconds to respond.")
+
+        self._rounds.add(interaction.channel_id)
+        try:
+            await interaction.response.send_message(embed=embed, view=view)
+            await view.wait()
+        finally:
+            self._rounds.discard(interaction.channel_id)
+
+        winners = []
+        for member_id, answer in view.answers.items():
+            won = answer == question.correct_answer
+            self._record(member_id, interaction.guild_id, [1, int(won), int(not won)])
+            if won:
+                winners.append(member_id)
+
+        # a single write for the whole round
+        if view.answers:
+            async with self._batch_lock:
+                try:
+                    await self.bulk_upsert()
+                except Exception:
+                    # the results are kept and written on the next flush
+                    log.exception("Cannot write the trivia round results.")
+
+        embed.remove_footer()
+        embed.add_field(name="Correct answer", value=question.correct_answer)
+        embed.add_field(name="Answers", value=len(view.answers))
+        embed.add_field(
+            name=f"Winners ({len(winners)})",
+            value=", ".join(f"<@{member_id}>" for member_id in winners[:40]) or "Nobody",
+            inline=False,
+        )
+        await interaction.edit_original_response(embed=embed, view=None)
+
     @trivia.command()
     @app_commands.describe(member="The member to show trivia stats for")
     async def stats(self, interaction: discord.Interaction, member: None | Member = None) -> None:
@@ -164,21 +369,49 @@ class Trivia(commands.Cog):
 
     @trivia.command()
     @app_commands.checks.cooldown(1, 60.0, key=lambda i: i.user.id)
-    async def best(self, interaction: discord.Interaction) -> None:
+    @app_commands.describe(scope="Whether to show the best players of all time or of this server")
+    async def best(
+        self, interaction: discord.Interaction, scope: Literal["global", "server"] = "global"
+    ) -> None:
         """Shows top 10 trivia players (based on games won)."""
-        query = """SELECT id, started, won, lost
-                   FROM trivia
-                   WHERE id <> $1
-                   ORDER BY won DESC
+        if scope == "server":
+            if interaction.guild is None:
+                await interaction.response.send_message("This scope is only available in servers.")
+                return
+            guild_id = interaction.guild.id
+            title = f"Best Trivia Players in {interaction.guild}"
+        else:
+            guild_id = 0  # the global leaderboard
+            title = "Best Trivia Players"
+
+        query = """SELECT member_id, started, won, lost
+                   FROM trivia_leaderboard
+                   WHERE guild_id = $1 AND member_id <> $2
+                   ORDER BY rank, member_id
                    LIMIT 10;
                 """
-        players = await self.bot.pool.fetch(query, self.bot.config.owner_id)
+        players = await self.bot.pool.fetch(query, guild_id, self.bot.config.owner_id)
+        # the owner is ranked in the view but not shown, do not count them
+        query = """SELECT rank - (
+                       SELECT COUNT(*)
+                       FROM trivia_leaderboard
+                       WHERE guild_id = $1 AND member_id = $3 AND rank < me.rank
+                   )
+                   FROM trivia_leaderboard AS me
+                   WHERE guild_id = $1 AND member_id = $2;
+                """
+        rank = await self.bot.pool.fetchval(
+            query, guild_id, interaction.user.id, self.bot.config.owner_id
+        )
+
         embed = discord.Embed(color=self.bot.get_user_color(interaction.user.id))
-        embed.title = "Best Trivia Players"
+        embed.title = title
+
+        displays = await self.bot.displays.resolve_users(p["member_id"] for p in players)
 
         board = []
         for index, player in enumerate(players, start=1):
-            cur_player = await self.bot.fetch_user(player["id"])
+            cur_player = displays.get(player["member_id"], "Unknown player")
             ratio = self.get_player_ratio(player["won"], player["lost"])
             board.append(
                 "{index}. **{player}** Played: {played} | Won: {won} | Lost: {lost} | Ratio: {ratio}".format(
@@ -190,7 +423,11 @@ class Trivia(commands.Cog):
                     ratio=round(ratio, 2),
                 )
             )
-        embed.description = "\n".join(board)
+        embed.description = "\n".join(board) or "Nobody has played yet."
+        if rank is not None:
+            embed.set_footer(text=f"Your rank: #{rank} - Updated every 5 minutes")
+        else:
+            embed.set_footer(text="Updated every 5 minutes")
         await interaction.response.send_message(embed=embed)
 
 
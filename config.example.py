@@ -29,6 +29,18 @@ obapi = {
     "token": "",
 }
 
+"""Local web server the website can poll instead of (or along with) being pushed to.
+
+It also serves the /health and /ready probes.
+Leave the token empty to serve the documents without authorization.
+"""
+local_api = {
+    "enabled": False,
+    "host": "127.0.0.1",
+    "port": 8080,
+    "token": "",
+}
+
 # ENDIGNORE
 
 """The owner's ID."""
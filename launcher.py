@@ -7,6 +7,7 @@ import json
 import logging
 import os
 import re
+import subprocess
 import sys
 import traceback
 import uuid
@@ -173,7 +174,7 @@ def setup_logging() -> None:
     log.addHandler(handler)
 
 
-async def run_bot() -> None:
+async def run_bot(*, force_sync: bool = False) -> None:
     intents = discord.Intents(
         guilds=True,
         members=True,
@@ -188,6 +189,7 @@ async def run_bot() -> None:
         application_id=config.application_id,
         intents=intents,
         chunk_guilds_at_startup=False,
+        force_sync=force_sync,
     ) as bot:
         bot.pool = await asyncpg.create_pool(
             config.database, min_size=20, max_size=20, command_timeout=120
@@ -196,12 +198,107 @@ async def run_bot() -> None:
 
 
 @click.group(invoke_without_command=True, options_metavar="[options]")
+@click.option(
+    "--sync", "force_sync", help="Sync application commands even if unchanged.", is_flag=True
+)
 @click.pass_context
-def main(ctx):
+def main(ctx, force_sync):
     """Launches the bot"""
     if ctx.invoked_subcommand is None:
         setup_logging()
-        asyncio.run(run_bot())
+        asyncio.run(run_bot(force_sync=force_sync))
+
+
+IMPORT_TIME_LINE = re.compile(
+    r"import time:\s*(?P<self>\d+)\s*\|\s*(?P<cumulative>\d+)\s*\|(?P<name>.+)"
+)
+
+
+@main.command(short_help="Profile modules import time", options_metavar="[options]")
+@click.option("--top", help="How many modules to show.", default=25, show_default=True)
+@click.argument("modules", nargs=-1)
+def importtime(top, modules):
+    """Reports the cumulative import time of the bot modules (or of the given ones)"""
+    if not modules:
+        cogs = sorted(f"cogs.{f[:-3]}" for f in os.listdir("cogs") if f.endswith(".py"))
+        modules = ("bot", *cogs)
+
+    # a fresh interpreter is needed, otherwise most modules would already be imported
+    code = "\n".join(f"import {module}" for module in modules)
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True
+    )
+
+    timings: dict[str, tuple[int, int]] = {}
+    for line in process.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match is not None:
+            name = match.group("name").strip()
+            timings[name] = (int(match.group("self")), int(match.group("cumulative")))
+
+    if process.returncode != 0:
+        click.echo(process.stderr.splitlines()[-1] if process.stderr else "")
+        click.secho("failed to import the modules", fg="red")
+        return
+
+    ordered = sorted(timings.items(), key=lambda t: t[1][1], reverse=True)
+    click.echo(f"{'cumulative':>12} {'self':>10}  module")
+    for name, (self_us, cumulative_us) in ordered[:top]:
+        as_yellow = click.style(f"{cumulative_us / 1000:>10.1f}ms", fg="yellow")
+        click.echo(f"{as_yellow} {self_us / 1000:>8.1f}ms  {name}")
+
+    total = sum(timings[m][1] for m in modules if m in timings)
+    click.secho(f"Imported {len(timings)} modules in {total / 1000:.1f}ms", fg="green")
+
+
+@main.command(short_help="Benchmark the news scraper", options_metavar="[options]")
+@click.option("--runs", help="How many times each file is parsed.", default=20, show_default=True)
+@click.option(
+    "--kind",
+    type=click.Choice(["news", "article"]),
+    default="news",
+    show_default=True,
+    help="Whether the files are the news page or single articles.",
+)
+@click.option("--save", help="Download the news page to the given file first.", is_flag=True)
+@click.argument("fixtures", nargs=-1, required=True, type=click.Path(path_type=Path))
+def scrapebench(runs, kind, save, fixtures):
+    """Compares parsing saved HTML fixtures with a full BeautifulSoup tree and with the scraper"""
+    import time
+    import urllib.request
+
+    from bs4 import BeautifulSoup
+
+    from utils.scrape import parse_article, parse_news
+
+    if save:
+        fixtures[0].parent.mkdir(parents=True, exist_ok=True)
+        with urllib.request.urlopen(config.overwatch["news"]) as r:
+            fixtures[0].write_bytes(r.read())
+
+    def bench(func, content: bytes) -> tuple[float, float]:
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            func(content)
+            timings.append(time.perf_counter() - start)
+        return sum(timings) / len(timings) * 1000, max(timings) * 1000
+
+    if kind == "news":
+        scraper = parse_news
+    else:
+        scraper = lambda content: parse_article(content, url="")  # noqa: E731
+
+    for fixture in fixtures:
+        content = fixture.read_bytes()
+        click.secho(f"{fixture} ({len(content) / 1024:.0f}KiB)", bold=True)
+        for name, func in (
+            ("bs4 full tree", lambda content: BeautifulSoup(content, features="lxml")),
+            ("scraper", scraper),
+        ):
+            mean, worst = bench(func, content)
+            as_yellow = click.style(f"{mean:>8.2f}ms", fg="yellow")
+            click.echo(f"  {name:<14} {as_yellow} mean {worst:>8.2f}ms worst")
 
 
 @main.group(short_help="Database commands", options_metavar="[options]")
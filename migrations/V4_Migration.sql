@@ -0,0 +1,10 @@
+-- Revises: V3
+-- Creation Date: 2026-10-19 09:12:48.530217+00:00 UTC
+-- Reason: Track news delivery per channel so broadcasts can be resumed
+
+CREATE TABLE IF NOT EXISTS news_delivery (
+    news_id INTEGER,
+    channel_id BIGINT,
+    delivered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (news_id, channel_id)
+);
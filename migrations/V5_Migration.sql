@@ -0,0 +1,9 @@
+-- Revises: V4
+-- Creation Date: 2026-10-19 09:41:07.214853+00:00 UTC
+-- Reason: Track every delivered news ID instead of only the latest one
+
+INSERT INTO news (id) VALUES (1) ON CONFLICT (id) DO NOTHING;
+
+ALTER TABLE news ADD COLUMN IF NOT EXISTS delivered_ids INTEGER[] DEFAULT '{}' NOT NULL;
+
+UPDATE news SET delivered_ids = ARRAY[latest_id] WHERE id = 1 AND latest_id <> 0;
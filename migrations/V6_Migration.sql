@@ -0,0 +1,28 @@
+-- Revises: V5
+-- Creation Date: 2026-10-19 11:02:36.118204+00:00 UTC
+-- Reason: Per-guild trivia stats and materialized trivia leaderboards
+
+CREATE TABLE IF NOT EXISTS trivia_guild (
+    guild_id BIGINT,
+    member_id BIGINT,
+    started INTEGER DEFAULT 0,
+    won INTEGER DEFAULT 0,
+    lost INTEGER DEFAULT 0,
+    PRIMARY KEY (guild_id, member_id)
+);
+
+-- guild_id = 0 holds the global leaderboard
+CREATE MATERIALIZED VIEW IF NOT EXISTS trivia_leaderboard AS
+    SELECT 0::BIGINT AS guild_id, id AS member_id, started, won, lost,
+           RANK() OVER (ORDER BY won DESC) AS rank
+    FROM trivia
+    UNION ALL
+    SELECT guild_id, member_id, started, won, lost,
+           RANK() OVER (PARTITION BY guild_id ORDER BY won DESC) AS rank
+    FROM trivia_guild;
+
+-- the unique index is required to refresh the view concurrently
+CREATE UNIQUE INDEX IF NOT EXISTS trivia_leaderboard_member_idx
+    ON trivia_leaderboard (guild_id, member_id);
+CREATE INDEX IF NOT EXISTS trivia_leaderboard_rank_idx
+    ON trivia_leaderboard (guild_id, rank);
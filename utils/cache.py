@@ -3,11 +3,14 @@
 from __future__ import annotations
 
 import asyncio
+import datetime
 import enum
 import inspect
+import sys
 import time
+from collections import deque
 from functools import wraps
-from typing import Any, Awaitable, Callable, Coroutine, MutableMapping, Protocol, TypeVar
+from typing import Any, Awaitable, Callable, Coroutine, Iterator, MutableMapping, Protocol, TypeVar
 
 from lru import LRU
 
@@ -47,17 +50,176 @@ def _wrap_new_coroutine(value: R) -> Coroutine[Any, Any, R]:
     return new_coroutine()
 
 
+def estimate_size(obj: Any) -> int:
+    """Roughly estimates the memory used by a container and its contents, in bytes."""
+    seen: set[int] = set()
+    stack = [obj]
+    total = 0
+    while stack:
+        o = stack.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        total += sys.getsizeof(o, 0)
+        if isinstance(o, (str, bytes, bytearray)):
+            continue
+        items = getattr(o, "items", None)
+        if callable(items):
+            for k, v in items():
+                stack.append(k)
+                stack.append(v)
+        elif isinstance(o, (list, tuple, set, frozenset, deque)):
+            stack.extend(o)
+    return total
+
+
+class CacheEntry:
+    """Bookkeeping for a cache registered in the cache registry."""
+
+    __slots__ = (
+        "name",
+        "hits",
+        "misses",
+        "evictions",
+        "populated_at",
+        "_target",
+        "_flush",
+        "_warm",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        target: Callable[[], Any],
+        *,
+        flush: None | Callable[[], Any] = None,
+        warm: None | Callable[[], Awaitable[Any]] = None,
+    ) -> None:
+        self.name: str = name
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.populated_at: datetime.datetime = datetime.datetime.now(datetime.UTC)
+        self._target = target
+        self._flush = flush
+        self._warm = warm
+
+    @property
+    def target(self) -> Any:
+        return self._target()
+
+    @property
+    def size(self) -> int:
+        try:
+            return len(self.target)
+        except TypeError:
+            return 0
+
+    @property
+    def estimated_bytes(self) -> int:
+        return estimate_size(self.target)
+
+    @property
+    def age(self) -> float:
+        return (datetime.datetime.now(datetime.UTC) - self.populated_at).total_seconds()
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @property
+    def can_warm(self) -> bool:
+        return self._warm is not None
+
+    def hit(self) -> None:
+        self.hits += 1
+
+    def miss(self) -> None:
+        self.misses += 1
+
+    def evict(self, count: int = 1) -> None:
+        self.evictions += count
+
+    def touch(self) -> None:
+        self.populated_at = datetime.datetime.now(datetime.UTC)
+
+    def flush(self) -> int:
+        """Empties the cache and returns the number of entries removed."""
+        size = self.size
+        if self._flush is not None:
+            self._flush()
+        else:
+            self.target.clear()
+        self.touch()
+        return size
+
+    async def warm(self) -> bool:
+        if self._warm is None:
+            return False
+        await self._warm()
+        self.touch()
+        return True
+
+
+class CacheRegistry:
+    """Keeps track of every cache so that they can be inspected at runtime."""
+
+    def __init__(self) -> None:
+        self._entries: dict[str, CacheEntry] = {}
+
+    def __iter__(self) -> Iterator[CacheEntry]:
+        return iter(list(self._entries.values()))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    def register(
+        self,
+        name: str,
+        target: Callable[[], Any],
+        *,
+        flush: None | Callable[[], Any] = None,
+        warm: None | Callable[[], Awaitable[Any]] = None,
+    ) -> CacheEntry:
+        # registering twice (e.g. on extension reload) replaces the old entry
+        entry = CacheEntry(name, target, flush=flush, warm=warm)
+        self._entries[name] = entry
+        return entry
+
+    def unregister(self, name: str) -> None:
+        self._entries.pop(name, None)
+
+    def get(self, name: str) -> None | CacheEntry:
+        return self._entries.get(name)
+
+
+registry = CacheRegistry()
+
+
 class ExpiringCache(dict):
-    def __init__(self, seconds: float) -> None:
+    def __init__(self, seconds: float, callback: None | Callable[[Any, Any], Any] = None) -> None:
         self.__ttl: float = seconds
+        self.__callback = callback
         super().__init__()
 
     def __verify_cache_integrity(self):
+        # Keys are re-inserted on every write so the oldest entries always come
+        # first, which means we can stop at the first one that is still fresh.
         # Have to do this in two steps...
         current_time = time.monotonic()
-        to_remove = [k for (k, (v, t)) in self.items() if current_time > (t + self.__ttl)]
+        to_remove = []
+        for k, (v, t) in self.items():
+            if current_time <= (t + self.__ttl):
+                break
+            to_remove.append(k)
         for k in to_remove:
-            del self[k]
+            value, _ = super().pop(k)
+            if self.__callback is not None:
+                self.__callback(k, value)
 
     def __contains__(self, key: str):
         self.__verify_cache_integrity()
@@ -68,6 +230,7 @@ class ExpiringCache(dict):
         return super().__getitem__(key)
 
     def __setitem__(self, key: str, value: Any):
+        super().pop(key, None)
         super().__setitem__(key, (value, time.monotonic()))
 
 
@@ -83,15 +246,20 @@ def cache(
     ignore_kwargs: bool = False,
 ) -> Callable[[Callable[..., R]], CacheProtocol[R]]:
     def decorator(func: Callable[..., R]) -> CacheProtocol[R]:
+        entry = registry.register(f"{func.__module__}.{func.__qualname__}", lambda: _internal_cache)
+
+        def _on_evict(key: Any, value: Any) -> None:
+            entry.evict()
+
         if strategy is Strategy.lru:
-            _internal_cache = LRU(maxsize)
-            _stats = _internal_cache.get_stats
+            _internal_cache = LRU(maxsize, callback=_on_evict)
         elif strategy is Strategy.raw:
             _internal_cache = {}
-            _stats = lambda: (0, 0)  # noqa: E731
         elif strategy is Strategy.timed:
-            _internal_cache = ExpiringCache(maxsize)
-            _stats = lambda: (0, 0)  # noqa: E731
+            _internal_cache = ExpiringCache(maxsize, callback=_on_evict)
+
+        def _stats() -> tuple[int, int]:
+            return entry.hits, entry.misses
 
         def _make_key(args: tuple[Any, ...], kwargs: dict[str, Any]) -> str:
             # this is a bit of a cluster fuck
@@ -123,6 +291,7 @@ def cache(
             try:
                 value = _internal_cache[key]
             except KeyError:
+                entry.miss()
                 value = func(*args, **kwargs)
 
                 if inspect.isawaitable(value):
@@ -131,6 +300,7 @@ def cache(
                 _internal_cache[key] = value
                 return value
             else:
+                entry.hit()
                 if asyncio.iscoroutinefunction(func):
                     return _wrap_new_coroutine(value)
                 return value
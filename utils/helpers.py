@@ -2,7 +2,9 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from discord.app_commands import Choice, Group
+from discord.app_commands import Choice
+
+from utils.cache import registry
 
 if TYPE_CHECKING:
     from discord import Interaction
@@ -12,30 +14,28 @@ if TYPE_CHECKING:
 
 
 async def hero_autocomplete(interaction: Interaction, current: str) -> list[Choice[str]]:
+    bot: OverBot = getattr(interaction, "client")
+    return [Choice(name=name, value=key) for key, name in bot.catalog.hero_index.search(current)]
+
+
+async def role_autocomplete(interaction: Interaction, current: str) -> list[Choice[str]]:
     bot: OverBot = getattr(interaction, "client")
     return [
-        Choice(name=value["name"], value=key)
-        for key, value in bot.heroes.items()
-        if current.lower() in value["name"].lower() or current.lower() in key.lower()
-    ][:25]
+        Choice(name=role.capitalize(), value=role)
+        for role in sorted(bot.catalog.heroes_by_role)
+        if current.lower() in role
+    ]
 
 
 async def map_autocomplete(interaction: Interaction, current: str) -> list[Choice[str]]:
     bot: OverBot = getattr(interaction, "client")
-    return [
-        Choice(name=value["name"], value=key)
-        for key, value in bot.maps.items()
-        if current.lower() in value["name"].lower() or current.lower() in key.lower()
-    ][:25]
+    return [Choice(name=name, value=key) for key, name in bot.catalog.map_index.search(current)]
 
 
 async def gamemode_autocomplete(interaction: Interaction, current: str) -> list[Choice[str]]:
     bot: OverBot = getattr(interaction, "client")
-    return [
-        Choice(name=value["name"], value=key)
-        for key, value in bot.gamemodes.items()
-        if current.lower() in value["name"].lower() or current.lower() in key.lower()
-    ]
+    index = bot.catalog.gamemode_index
+    return [Choice(name=name, value=key) for key, name in index.search(current)]
 
 
 async def module_autocomplete(interaction: Interaction, current: str) -> list[Choice[str]]:
@@ -47,6 +47,14 @@ async def module_autocomplete(interaction: Interaction, current: str) -> list[Ch
     ]
 
 
+async def cache_autocomplete(interaction: Interaction, current: str) -> list[Choice[str]]:
+    return [
+        Choice(name=entry.name, value=entry.name)
+        for entry in registry
+        if current.lower() in entry.name.lower()
+    ][:25]
+
+
 async def profile_autocomplete(interaction: Interaction, current: str) -> list[Choice[str]]:
     profile_cog: ProfileCog = interaction.client.get_cog("profile")  # type: ignore
     profiles = await profile_cog.get_profiles(interaction, interaction.user.id)
@@ -59,9 +67,4 @@ async def profile_autocomplete(interaction: Interaction, current: str) -> list[C
 
 async def command_autocomplete(interaction: Interaction, current: str) -> list[Choice[str]]:
     bot: OverBot = getattr(interaction, "client")
-    commands = [c for c in bot.tree.walk_commands()]
-    return [
-        Choice(name=command.qualified_name, value=command.qualified_name)
-        for command in commands
-        if current.lower() in command.qualified_name.lower() and not isinstance(command, Group)
-    ][:25]
+    return [Choice(name=name, value=name) for name in bot.tree.search_commands(current)]
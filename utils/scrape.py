@@ -1,9 +1,10 @@
 # type: ignore
 from __future__ import annotations
 
+import asyncio
 from typing import TYPE_CHECKING
 
-from bs4 import BeautifulSoup
+from aiohttp import ClientTimeout
 
 import config
 
@@ -12,47 +13,78 @@ if TYPE_CHECKING:
     from aiohttp import ClientSession
 
 
-async def get_overwatch_news(*, session: ClientSession) -> News:
-    async with session.get(config.overwatch["news"]) as r:
-        content = await r.read()
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+NEWS_CARDS = (
+    f"/html/body/main[{_has_class('main-content')}]"
+    f"/div[{_has_class('news-header')}]/blz-news[1]//blz-card"
+)
+ARTICLE_TITLE = f"(//h1[{_has_class('blog-title')}])[1]"
+ARTICLE_IMAGE = f"(//div[{_has_class('blog-header-image')}])[1]//img[1]/@src"
+ARTICLE_DATE = f"(//span[{_has_class('publish-date')}])[1]"
 
-    root_kwargs = {"name": "main", "class_": "main-content", "recursive": False}
-    root = BeautifulSoup(content, features="lxml").body.find(**root_kwargs)
 
-    news_container = root.find("div", class_="news-header", recursive=False).find(
-        "blz-news", recursive=False
-    )
+def parse_news(content: bytes) -> News:
+    """Parses the news page. This is CPU bound, run it off the event loop."""
+    # lxml is heavy and rarely needed, thus it is imported lazily
+    import lxml.html
 
-    news = [
+    root = lxml.html.fromstring(content)
+    return [
         {
-            "title": n.find("h4", slot="heading").get_text(),
-            "link": "https://overwatch.blizzard.com/en-us" + n["href"],
-            "thumbnail": n.find("blz-image", slot="image")["src"],
-            "date": n["date"].split(":")[0][:-3],  # from YYYY-MM-DDT18:00:00.000Z to YYYY-MM-DD
+            "title": card.xpath("string(.//h4[@slot='heading'][1])"),
+            "link": "https://overwatch.blizzard.com/en-us" + card.get("href"),
+            "thumbnail": card.xpath(".//blz-image[@slot='image'][1]/@src")[0],
+            # from YYYY-MM-DDT18:00:00.000Z to YYYY-MM-DD
+            "date": card.get("date").split(":")[0][:-3],
         }
-        for n in news_container.find_all("blz-card")
+        for card in root.xpath(NEWS_CARDS)
     ]
-    return news
 
 
-async def get_overwatch_news_from_ids(ids: list[str], *, session: ClientSession) -> News:
-    news = []
-    for idx in ids:
-        url = config.overwatch["news"] + idx
-        async with session.get(url) as r:
-            content = await r.read()
+def parse_article(content: bytes, *, url: str) -> dict[str, str]:
+    """Parses a single news article. This is CPU bound, run it off the event loop."""
+    import lxml.html
+
+    root = lxml.html.fromstring(content)
+    return {
+        "title": root.xpath(f"string({ARTICLE_TITLE})"),
+        "link": url,
+        "thumbnail": root.xpath(ARTICLE_IMAGE)[0],
+        "date": root.xpath(f"string({ARTICLE_DATE})"),
+    }
+
+
+async def _get_article(idx: str, *, session: ClientSession) -> dict[str, str]:
+    url = config.overwatch["news"] + idx
+    async with session.get(url, timeout=ClientTimeout(total=30.0)) as r:
+        r.raise_for_status()
+        content = await r.read()
+    return await asyncio.to_thread(parse_article, content, url=url)
+
+
+async def get_overwatch_news_from_ids(
+    ids: list[str], *, session: ClientSession, limit: int = 4
+) -> tuple[dict[str, dict[str, str]], dict[str, Exception]]:
+    """Fetches up to limit articles at once.
 
-        root = BeautifulSoup(content, features="lxml")
+    Returns the news keyed by ID, in the given order, and the IDs that
+    could not be fetched along with the reason.
+    """
+    semaphore = asyncio.Semaphore(limit)
 
-        image = root.find("div", class_="blog-header-image")
+    async def fetch(idx: str) -> dict[str, str]:
+        async with semaphore:
+            return await _get_article(idx, session=session)
 
-        news.append(
-            {
-                "title": root.find("h1", class_="blog-title").get_text(),
-                "link": url,
-                "thumbnail": image.find("img")["src"],
-                "date": root.find("span", class_="publish-date").get_text(),
-            }
-        )
+    results = await asyncio.gather(*(fetch(idx) for idx in ids), return_exceptions=True)
 
-    return news
+    news, failed = {}, {}
+    for idx, result in zip(ids, results):
+        if isinstance(result, Exception):
+            failed[idx] = result
+        else:
+            news[idx] = result
+    return news, failed
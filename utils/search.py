@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import re
+import unicodedata
+from typing import Iterable
+
+_NON_ALPHANUMERIC = re.compile(r"[^a-z0-9]+")
+
+# Minimum trigram similarity for a fuzzy match to be returned.
+FUZZY_THRESHOLD = 0.3
+
+
+def normalize(text: str) -> str:
+    """Lowercases text, strips accents and turns punctuation into single spaces.
+
+    e.g. "Lúcio" -> "lucio", "Soldier: 76" -> "soldier 76", "D.Va" -> "d va"
+    """
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    return _NON_ALPHANUMERIC.sub(" ", text).strip()
+
+
+def _trigrams(text: str) -> frozenset[str]:
+    padded = f"  {text} "
+    return frozenset("".join(t) for t in zip(padded, padded[1:], padded[2:]))
+
+
+class SearchIndex:
+    """Ranked search over a small, rarely changing set of names.
+
+    Prefixes and trigrams are precomputed when the index is built, so that
+    most lookups only cost a couple of dictionary accesses. Matches are ranked
+    as exact, prefix, word prefix, substring and lastly fuzzy (typos).
+    """
+
+    __slots__ = ("_entries", "_terms", "_term_trigrams", "_prefixes", "_trigrams")
+
+    def __init__(self, entries: Iterable[tuple[str, str, Iterable[str]]] = ()) -> None:
+        # entries are (value, name, aliases)
+        self._entries: list[tuple[str, str]] = []
+        self._terms: list[tuple[str, ...]] = []
+        self._term_trigrams: list[tuple[frozenset[str], ...]] = []
+        self._prefixes: dict[str, dict[int, int]] = {}
+        self._trigrams: dict[str, set[int]] = {}
+
+        for value, name, aliases in sorted(entries, key=lambda e: normalize(e[1])):
+            index = len(self._entries)
+            self._entries.append((value, name))
+
+            terms = {normalize(t) for t in (name, value, *aliases)} - {""}
+            # "d va" must be reachable by typing "dva" too
+            terms |= {t.replace(" ", "") for t in terms}
+            self._terms.append(tuple(terms))
+            self._term_trigrams.append(tuple(_trigrams(t) for t in terms))
+
+            for term in terms:
+                self._add_prefixes(term, index, rank=1)
+                for word in term.split()[1:]:
+                    self._add_prefixes(word, index, rank=2)
+                for trigram in _trigrams(term):
+                    self._trigrams.setdefault(trigram, set()).add(index)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _add_prefixes(self, term: str, index: int, *, rank: int) -> None:
+        for i in range(1, len(term) + 1):
+            ranks = self._prefixes.setdefault(term[:i], {})
+            rank_ = 0 if i == len(term) and rank == 1 else rank
+            ranks[index] = min(ranks.get(index, rank_), rank_)
+
+    def search(self, query: str, *, limit: int = 25) -> list[tuple[str, str]]:
+        """Returns up to limit (value, name) pairs, best matches first."""
+        query = normalize(query)
+        if not query:
+            return self._entries[:limit]
+
+        # index -> (rank, secondary score); lower is better
+        scores: dict[int, tuple[int, float]] = {}
+
+        for q in {query, query.replace(" ", "")}:
+            for index, rank in self._prefixes.get(q, {}).items():
+                scores[index] = min(scores.get(index, (rank, 0.0)), (rank, 0.0))
+
+        if len(scores) < limit:
+            # the indexed sets are small, a plain scan is cheaper than an n-gram lookup
+            for index, terms in enumerate(self._terms):
+                if index not in scores and any(query in term for term in terms):
+                    scores[index] = (3, 0.0)
+
+        if len(scores) < limit and len(query) >= 3:
+            trigrams = _trigrams(query)
+            candidates: set[int] = set()
+            for trigram in trigrams:
+                candidates.update(self._trigrams.get(trigram, ()))
+
+            for index in candidates - scores.keys():
+                # Dice coefficient against the closest term
+                similarity = max(
+                    2 * len(trigrams & other) / (len(trigrams) + len(other))
+                    for other in self._term_trigrams[index]
+                )
+                if similarity >= FUZZY_THRESHOLD:
+                    scores[index] = (4, -similarity)
+
+        ordered = sorted(scores, key=lambda i: (scores[i], i))
+        return [self._entries[i] for i in ordered[:limit]]